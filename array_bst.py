@@ -0,0 +1,263 @@
+""" Array-backed Binary Search Tree ADT.
+    Defines a Binary Search Tree with the same mapping interface as bst.BinarySearchTree,
+    but instead of linked TreeNode objects every node is an index into parallel
+    arrays of keys, items, left and right child indices and subtree sizes.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from array import array
+from typing import TypeVar, Generic, Iterator
+
+# generic types
+K = TypeVar('K')
+I = TypeVar('I')
+
+# index used for a missing child, like None in a TreeNode
+NIL = -1
+
+
+class ArrayBinarySearchTree(Generic[K, I]):
+    """
+        Binary search tree stored as a struct of arrays.
+
+        Nodes are referred to by their index. The child links and subtree sizes
+        live in machine-word arrays and the keys in a Python list, or in an
+        array of the given key_type typecode (e.g. 'q' or 'd') for numeric keys,
+        so a node costs a few words instead of a Python object. Deleted slots
+        are chained through the left array into a free list and reused by
+        later inserts. The arrays expose the buffer protocol, so the tree
+        pickles as a handful of flat buffers.
+    """
+
+    def __init__(self, key_type: str | None = None) -> None:
+        """
+            Initialises an empty tree
+            :complexity: O(1)
+        """
+        self.root = NIL
+        self.length = 0
+        self.free = NIL
+        self.keys_ = array(key_type) if key_type is not None else []
+        self.items_ = []
+        self.left = array('q')
+        self.right = array('q')
+        self.subtree_size = array('q')
+
+    def is_empty(self) -> bool:
+        """
+            Checks to see if the tree is empty
+            :complexity: O(1)
+        """
+        return self.root == NIL
+
+    def __len__(self) -> int:
+        """ Returns the number of nodes in the tree. """
+
+        return self.length
+
+    def __contains__(self, key: K) -> bool:
+        """
+            Checks to see if the key is in the tree
+            :complexity: see get_tree_node_by_key
+        """
+        return self.find(key) != NIL
+
+    def __getitem__(self, key: K) -> I:
+        """
+            Attempts to get an item in the tree, it uses the Key to attempt to find it
+            :complexity: see get_tree_node_by_key
+        """
+        return self.items_[self.get_tree_node_by_key(key)]
+
+    def get_tree_node_by_key(self, key: K) -> int:
+        """
+            Returns the index of the node holding key.
+            :complexity best: O(CompK) finds the key at the root
+            :complexity worst: O(CompK * D) key is not found, where D is the depth of the tree
+            :raises KeyError: if the key is not in the tree
+        """
+        current = self.find(key)
+        if current == NIL:
+            raise KeyError('Key not found: {0}'.format(key))
+        return current
+
+    def find(self, key: K) -> int:
+        """
+            Returns the index of the node holding key, or NIL if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        keys, left, right = self.keys_, self.left, self.right
+        current = self.root
+        while current != NIL:
+            current_key = keys[current]
+            if key == current_key:
+                return current
+            elif key < current_key:
+                current = left[current]
+            else:  # key > current_key
+                current = right[current]
+        return NIL
+
+    def create_node(self, key: K, item: I) -> int:
+        """
+            Stores a new leaf in a free slot, or at the end of the arrays, and returns its index.
+            :complexity: O(1) amortised
+        """
+        if self.free != NIL:
+            index = self.free
+            self.free = self.left[index]
+            self.keys_[index] = key
+            self.items_[index] = item
+            self.left[index] = NIL
+            self.right[index] = NIL
+            self.subtree_size[index] = 1
+        else:
+            index = len(self.items_)
+            self.keys_.append(key)
+            self.items_.append(item)
+            self.left.append(NIL)
+            self.right.append(NIL)
+            self.subtree_size.append(1)
+        return index
+
+    def free_node(self, index: int) -> None:
+        """
+            Puts the slot of a detached node on the free list.
+            :complexity: O(1)
+        """
+        self.items_[index] = None
+        if isinstance(self.keys_, list):
+            self.keys_[index] = None
+        self.left[index] = self.free
+        self.free = index
+
+    def __setitem__(self, key: K, item: I) -> None:
+        """
+            Attempts to insert an item into the tree, it uses the Key to insert it
+            :complexity best: O(CompK) inserts the item at the root.
+            :complexity worst: O(CompK * D) inserting at the bottom of the tree
+            where D is the depth of the tree
+            :raises ValueError: if the key is already in the tree
+        """
+        keys, left, right = self.keys_, self.left, self.right
+        path = []
+        current = self.root
+        while current != NIL:
+            path.append(current)
+            current_key = keys[current]
+            if key < current_key:
+                current = left[current]
+            elif key > current_key:
+                current = right[current]
+            else:  # key == current_key
+                raise ValueError('Inserting duplicate item')
+
+        index = self.create_node(key, item)
+        if not path:
+            self.root = index
+        else:
+            parent = path[-1]
+            if key < keys[parent]:
+                left[parent] = index
+            else:
+                right[parent] = index
+            subtree_size = self.subtree_size
+            for node in path:
+                subtree_size[node] += 1
+        self.length += 1
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Attempts to delete an item from the tree, it uses the Key to
+            determine the node to delete. A node with two children takes
+            the key and item of its successor, whose slot is freed instead.
+            :complexity: O(CompK * D) where D is the depth of the tree
+            :raises ValueError: if the key is not in the tree
+        """
+        keys, left, right = self.keys_, self.left, self.right
+        path = []
+        current = self.root
+        while current != NIL and key != keys[current]:
+            path.append(current)
+            if key < keys[current]:
+                current = left[current]
+            else:  # key > keys[current]
+                current = right[current]
+        if current == NIL:  # key not found
+            raise ValueError('Deleting non-existent item')
+
+        if left[current] != NIL and right[current] != NIL:
+            # general case => find a successor
+            path.append(current)
+            succ = right[current]
+            while left[succ] != NIL:
+                path.append(succ)
+                succ = left[succ]
+            keys[current] = keys[succ]
+            self.items_[current] = self.items_[succ]
+            current, replacement = succ, right[succ]
+        elif left[current] == NIL:
+            replacement = right[current]
+        else:
+            replacement = left[current]
+
+        if not path:
+            self.root = replacement
+        elif left[path[-1]] == current:
+            left[path[-1]] = replacement
+        else:
+            right[path[-1]] = replacement
+        subtree_size = self.subtree_size
+        for node in path:
+            subtree_size[node] -= 1
+        self.free_node(current)
+        self.length -= 1
+
+    def kth_smallest(self, k: int, current: int | None = None) -> int:
+        """
+            Returns the index of the node holding the kth smallest key in the
+            subtree rooted at current (the whole tree by default).
+            :complexity: O(D) where D is the depth of the tree
+            :raises ValueError: if k is out of range
+        """
+        left, right, subtree_size = self.left, self.right, self.subtree_size
+        if current is None:
+            current = self.root
+        while current != NIL:
+            left_side = subtree_size[left[current]] if left[current] != NIL else 0
+            if k == left_side + 1:
+                return current
+            elif k <= left_side:
+                current = left[current]
+            else:
+                k -= left_side + 1
+                current = right[current]
+        raise ValueError("Invalid current node")
+
+    def __iter__(self) -> Iterator[K]:
+        """
+            Iterates over the keys in increasing order.
+            :complexity: O(1) per key on average
+        """
+        for key, _ in self.items():
+            yield key
+
+    def items(self) -> Iterator[tuple[K, I]]:
+        """
+            Lazily yields the (key, item) pairs in increasing order of key,
+            keeping the pending ancestors on an explicit stack.
+            :complexity: O(N) in total, where N is the number of nodes
+        """
+        stack = []
+        current = self.root
+        while stack or current != NIL:
+            if current != NIL:
+                stack.append(current)
+                current = self.left[current]
+            else:
+                current = stack.pop()
+                yield self.keys_[current], self.items_[current]
+                current = self.right[current]
@@ -0,0 +1,299 @@
+""" AVL Tree ADT.
+    Defines a self-balancing Binary Search Tree.
+    Rotations keep the height of the tree logarithmic in the number of nodes
+    while the subtree sizes used by kth_smallest are kept up to date.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from typing import TypeVar
+from bst import BinarySearchTree
+from node import AVLTreeNode
+
+# generic types
+K = TypeVar('K')
+I = TypeVar('I')
+
+
+class AVLTree(BinarySearchTree[K, I]):
+    """
+        Self-balancing binary search tree with the same interface as BinarySearchTree.
+
+        insert_aux and delete_aux stop rebalancing at the first sub-tree whose
+        height is unchanged, and above it only adjust subtree_size, without
+        calling update_node. A subclass whose nodes carry any other aggregate
+        must therefore not call them directly: it has to adjust that aggregate
+        on the ancestors itself beforehand, as CountedAVLTree.add and remove do.
+    """
+
+    def get_height(self, current: AVLTreeNode | None) -> int:
+        """
+            Get the height of a node. Return current.height if current is
+            not None. Otherwise, return 0.
+            :complexity: O(1)
+        """
+        if current is not None:
+            return current.height
+        return 0
+
+    def get_balance(self, current: AVLTreeNode) -> int:
+        """
+            Compute the balance factor for the current sub-tree as the value
+            (right.height - left.height).
+            :complexity: O(1)
+        """
+        return self.get_height(current.right) - self.get_height(current.left)
+
+    def create_node(self, key: K, item: I) -> AVLTreeNode:
+        """
+            Creates a leaf AVL node.
+            :complexity: O(1)
+        """
+        return AVLTreeNode(key, item=item)
+
+    def update_node(self, current: AVLTreeNode) -> None:
+        """
+            Recompute the height and subtree size of current from its children,
+            reading each child once as this runs on every node of every update path.
+            :complexity: O(1)
+        """
+        left, right = current.left, current.right
+        height = size = 0
+        if left is not None:
+            height, size = left.height, left.subtree_size
+        if right is not None:
+            if right.height > height:
+                height = right.height
+            size += right.subtree_size
+        current.height = height + 1
+        current.subtree_size = size + 1
+
+    def insert_aux(self, current: AVLTreeNode, key: K, item: I) -> AVLTreeNode:
+        """
+            Attempts to insert an item into the tree, it uses the Key to insert it
+            and rebalances the nodes on the way back up.
+
+            Doc: the path down to the new leaf is kept on a stack and walked back
+            up, rebalancing every node. once a sub-tree comes out of it with the
+            height it had before, nothing above it can become unbalanced, so the
+            remaining ancestors only have their subtree_size incremented.
+
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree
+            CompK is the complexity of comparing the keys
+        """
+        path = []
+        node = current
+        while node is not None:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                node = node.right
+            else:  # key == node.key
+                raise ValueError('Inserting duplicate item')
+
+        self.length += 1
+        new = self.create_node(key, item)
+        if not path:
+            return new
+        if key < path[-1].key:
+            path[-1].left = new
+        else:
+            path[-1].right = new
+
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            height = node.height
+            subtree = self.rebalance(node)
+            if depth == 0:
+                return subtree
+            if subtree is not node:
+                parent = path[depth - 1]
+                if parent.left is node:
+                    parent.left = subtree
+                else:
+                    parent.right = subtree
+            if subtree.height == height:
+                for ancestor in path[:depth]:
+                    ancestor.subtree_size += 1
+                return current
+
+    def insert_sorted(self, pairs: list[tuple[K, I]]) -> None:
+        """
+            Inserts a batch of new (key, item) pairs one at a time, since
+            hanging whole sub-trees under a leaf could break the AVL balance.
+            :complexity: O(CompK * m log N) where m is the size of the batch
+        """
+        for key, item in pairs:
+            self.root = self.insert_aux(self.root, key, item)
+
+    def delete_aux(self, current: AVLTreeNode, key: K) -> AVLTreeNode:
+        """
+            Attempts to delete an item from the tree, it uses the Key to
+            determine the node to delete and rebalances every node on the way back up.
+            A node with two children takes the key and item of its successor,
+            which is unlinked instead. The path is kept on a stack and parents
+            are matched by identity, as the key of a node may have changed. As
+            in insert_aux, the rebalancing stops at the first sub-tree whose
+            height is unchanged, and the ancestors above it only shrink by one.
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree
+            CompK is the complexity of comparing the keys
+        """
+        path = []
+        node = current
+        while node is not None and key != node.key:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            else:  # key > node.key
+                node = node.right
+        if node is None:  # key not found
+            raise ValueError('Deleting non-existent item')
+
+        if node.left is not None and node.right is not None:
+            # general case => find a successor
+            path.append(node)
+            succ = node.right
+            while succ.left is not None:
+                path.append(succ)
+                succ = succ.left
+            node.key = succ.key
+            node.item = succ.item
+            node, replacement = succ, succ.right
+        elif node.left is None:
+            replacement = node.right
+        else:
+            replacement = node.left
+
+        self.length -= 1
+        if not path:
+            return replacement
+        if path[-1].left is node:
+            path[-1].left = replacement
+        else:
+            path[-1].right = replacement
+
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            height = node.height
+            subtree = self.rebalance(node)
+            if depth == 0:
+                return subtree
+            if subtree is not node:
+                parent = path[depth - 1]
+                if parent.left is node:
+                    parent.left = subtree
+                else:
+                    parent.right = subtree
+            if subtree.height == height:
+                for ancestor in path[:depth]:
+                    ancestor.subtree_size -= 1
+                return current
+
+    def join_aux(self, left: AVLTreeNode | None, current: AVLTreeNode, right: AVLTreeNode | None) -> AVLTreeNode:
+        """
+            Returns the root of a balanced sub-tree holding left, then current,
+            then right, where all keys of left are smaller than current.key and
+            all keys of right are greater.
+
+            Doc: if the heights of left and right differ by more than one,
+            the spine of the taller tree facing the shorter one is walked down
+            to the first node no more than one taller than the shorter tree.
+            current is put there with that node and the shorter tree as its
+            children, and the walked spine is rebalanced on the way back up
+            as after an insertion.
+
+            :complexity: O(|height(left) - height(right)| + 1)
+        """
+        left_height = self.get_height(left)
+        right_height = self.get_height(right)
+        path = []
+        if left_height > right_height + 1:
+            while self.get_height(left) > right_height + 1:
+                path.append(left)
+                left = left.right
+        elif right_height > left_height + 1:
+            while self.get_height(right) > left_height + 1:
+                path.append(right)
+                right = right.left
+
+        current.left = left
+        current.right = right
+        self.update_node(current)
+        for parent in reversed(path):
+            if left_height > right_height:
+                parent.right = current
+            else:
+                parent.left = current
+            current = self.rebalance(parent)
+        return current
+
+    def left_rotate(self, current: AVLTreeNode) -> AVLTreeNode:
+        r"""
+            Perform left rotation of the sub-tree.
+            Right child of the current node, i.e. of the root of the target
+            sub-tree, should become the new root of the sub-tree.
+            returns the new root of the subtree.
+            Example:
+
+                 current                                       child
+                /       \                                      /   \
+            l-tree     child           -------->        current     r-tree
+                      /     \                           /     \
+                 center     r-tree                 l-tree     center
+
+            :complexity: O(1)
+        """
+        child = current.right
+        current.right = child.left
+        child.left = current
+        self.update_node(current)
+        self.update_node(child)
+        return child
+
+    def right_rotate(self, current: AVLTreeNode) -> AVLTreeNode:
+        r"""
+            Perform right rotation of the sub-tree.
+            Left child of the current node, i.e. of the root of the target
+            sub-tree, should become the new root of the sub-tree.
+            returns the new root of the subtree.
+            Example:
+
+                       current                                child
+                      /       \                              /     \
+                  child       r-tree     --------->     l-tree     current
+                 /     \                                           /     \
+            l-tree     center                                 center     r-tree
+
+            :complexity: O(1)
+        """
+        child = current.left
+        current.left = child.right
+        child.right = current
+        self.update_node(current)
+        self.update_node(child)
+        return child
+
+    def rebalance(self, current: AVLTreeNode) -> AVLTreeNode:
+        """
+            Compute the balance of the current node and do rebalancing of the
+            sub-tree of this node if necessary, returning its new root.
+            Also recomputes height and subtree_size of current.
+            :complexity: O(1)
+        """
+        self.update_node(current)
+        left, right = current.left, current.right
+        balance = (right.height if right is not None else 0) - (left.height if left is not None else 0)
+        if balance >= 2:
+            if self.get_balance(current.right) < 0:
+                current.right = self.right_rotate(current.right)
+            return self.left_rotate(current)
+
+        if balance <= -2:
+            if self.get_balance(current.left) > 0:
+                current.left = self.left_rotate(current.left)
+            return self.right_rotate(current)
+
+        return current
@@ -1,44 +1,378 @@
 from __future__ import annotations
-from threedeebeetree import Point
-
-def make_ordering(my_coordinate_list: list[Point]) -> list[Point]:
-    sorted_points = sorted(my_coordinate_list, key=lambda p: p[0])  # sort the points based on the x-axis
-
-    def _octant_index(point):
-        """
-        This function returns the octant index of a point that
-        represents the region in which the point resides in a space.
-        If octant_index > 0, the point is in the positive half of the axis.
-        """
-        octant_index = 0
-        if point[0] > 0:
-            octant_index |= 1
-        if point[1] > 0:
-            octant_index |= 2
-        if point[2] > 0:
-            octant_index |= 4
-        return octant_index
-
-    def ordering_aux(points):
-        n = len(points)
-        if n <= 2:  # Base case: return the points with its pointers
-            return [point for point in points]
-
-        m = n // 2
-        left_half = points[:m]
-        right_half = points[m:]
-
-        # Recursive case: recursively divide and conquer the two halves of the list
-        left_ordered = ordering_aux(left_half)
-        right_ordered = ordering_aux(right_half)
-        pointers = [[], [], [], [], [], [], [], []]
-        for p in left_ordered:
-            i = _octant_index(p)
-            pointers[i].append(p)
-        for p in right_ordered:
-            i = _octant_index(p)
-            pointers[i].append(p)
-
-        return [point for points in pointers for point in points]
-
-    return ordering_aux(sorted_points)
+import os
+import tempfile
+from itertools import count
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator
+from threedeebeetree import BeeNode, Point, median_split_point
+
+# smallest group make_ordering hands to a worker process
+PARALLEL_MIN_SIZE = 1000
+
+# number of groups per worker make_ordering aims for, so that uneven octants still keep every worker busy
+PARALLEL_TASKS = 4
+
+# largest number of points sampled from a group to choose its splitting point when it does not fit in memory
+STREAM_SAMPLE = 8192
+
+
+def make_ordering(my_coordinate_list: list[Point], workers: int = 1) -> list[Point]:
+    """
+    Returns the points in an order that builds a balanced 3DBT when they are
+    inserted one by one into an empty tree. A point given more than once
+    appears once. With workers > 1 the octants below the top levels are
+    ordered by a pool of that many processes, giving the same result.
+
+    Doc: the points are split on the point chosen by median_split_point, which
+    estimates the median of every axis from an evenly spaced sample of at most
+    SPLIT_SAMPLE of the points and tries the few sampled points closest to
+    those medians against the whole set, keeping the one that splits it best.
+    the others are sorted into its 8 octants in a single pass.
+    each octant is split the same way, using an explicit stack of groups of
+    point references rather than slicing and re-concatenating lists, and every
+    splitting point is output before the points of its octants (root first).
+    inserting the output in order therefore rebuilds exactly the tree that
+    ThreeDeeBeeTree.from_points builds, as every point lands in the octant it
+    was sorted into. the medians are only estimated and median_split_point
+    keeps the best of a few candidates, so the ratio bound is approximate: it
+    holds whenever a point near the median triple exists and the sample
+    estimates it well, which is the case for points that are not
+    adversarially correlated, but it is not guaranteed.
+
+    in parallel, groups of at most 1 / (PARALLEL_TASKS * workers) of the points
+    are not split but left as a placeholder in the output. the coordinates of
+    those with at least PARALLEL_MIN_SIZE points are copied into one shared
+    memory block and each is ordered by a worker (see order_shared_group),
+    which sends back the order as positions in the group, while the smaller
+    ones are ordered in this process. the placeholders are then replaced by
+    the ordered groups. the partition does not depend on who orders a group,
+    so the output is the same as the serial one. coordinates that are not
+    integers fitting in 64 bits cannot be shared, so the groups are then all
+    ordered in this process, and such points are accepted by both modes alike.
+
+    time complexity: O(n log n) on average, where n is the number of points,
+    as every level of the partition does O(n) work and there are O(log n) levels.
+    :raises ValueError: if workers is not positive
+    """
+    if workers < 1:
+        raise ValueError('Number of workers must be positive: {0}'.format(workers))
+    points = list(dict.fromkeys(my_coordinate_list))
+    if workers == 1 or len(points) < PARALLEL_MIN_SIZE:
+        return order_group(points)
+
+    cutoff = max(PARALLEL_MIN_SIZE, len(points) // (PARALLEL_TASKS * workers))
+    ordering = order_group(points, cutoff)
+    groups = [entry for entry in ordering if isinstance(entry, list) and len(entry) >= PARALLEL_MIN_SIZE]
+    starts = []
+    coordinates = array('q')
+    try:
+        for group in groups:
+            starts.append(len(coordinates) // 3)
+            coordinates.extend(coordinate for point in group for coordinate in point)
+    except (TypeError, OverflowError):
+        # only 64-bit integer coordinates can be shared, so the groups are all ordered here instead
+        return [point for entry in ordering
+                for point in (order_group(entry) if isinstance(entry, list) else (entry,))]
+
+    ordered = {}
+    size = len(coordinates) * coordinates.itemsize
+    # the pool only starts processes once a task is submitted, so no group means no processes
+    shared = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        shared.buf[:size] = coordinates.tobytes()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tasks = [pool.submit(order_shared_group, shared.name, start, len(group))
+                     for start, group in zip(starts, groups)]
+            # the small groups are ordered here while the workers run
+            for entry in ordering:
+                if isinstance(entry, list) and len(entry) < PARALLEL_MIN_SIZE:
+                    ordered[id(entry)] = order_group(entry)
+            for task, group in zip(tasks, groups):
+                ordered[id(group)] = [group[position] for position in task.result()]
+    finally:
+        shared.close()
+        shared.unlink()
+    return [point for entry in ordering
+            for point in (ordered[id(entry)] if isinstance(entry, list) else (entry,))]
+
+
+def order_group(points: list[Point], cutoff: int = 0) -> list:
+    """
+    The partition of make_ordering for a list of distinct points. Groups of at
+    most cutoff points are left unordered, as a list in place of their points.
+    """
+    ordering = []
+    stack = [points] if points else []
+    while stack:
+        group = stack.pop()
+        if len(group) <= cutoff:
+            ordering.append(group)
+            continue
+        key = median_split_point(group)
+        ordering.append(key)
+        octants = [[] for _ in range(8)]
+        x, y, z = key
+        for point in group:
+            if point != key:
+                octants[(point[0] >= x) + 2 * (point[1] >= y) + 4 * (point[2] >= z)].append(point)
+        # pushed in reverse so that the octants are output in increasing order
+        for octant in reversed(octants):
+            if octant:
+                stack.append(octant)
+    return ordering
+
+
+def order_shared_group(name: str, start: int, size: int) -> array:
+    """
+    Orders the group of size points starting at point start of the shared
+    memory block name, holding 64-bit coordinates, and returns the order as the
+    positions of the points in the group. Runs in the worker processes of make_ordering.
+    """
+    coordinates = array('q')
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        with shared.buf[3 * start * coordinates.itemsize:3 * (start + size) * coordinates.itemsize] as view:
+            coordinates.frombytes(view)
+    finally:
+        shared.close()
+    group = list(zip(coordinates[0::3], coordinates[1::3], coordinates[2::3]))
+    position = {point: index for index, point in enumerate(group)}
+    return array('q', [position[point] for point in order_group(group)])
+
+
+def write_points(path: str | os.PathLike, points: Iterable[Point]) -> None:
+    """ Writes points to a binary file of native 32-bit signed integer triples, as read by stream_ordering. """
+    with open(path, 'wb') as file:
+        array('i', [coordinate for point in points for coordinate in point]).tofile(file)
+
+
+def read_points(path: str | os.PathLike, chunk_size: int) -> Iterator[list[Point]]:
+    """ Yields the points of a file written by write_points, at most chunk_size points at a time. """
+    with open(path, 'rb') as file:
+        while True:
+            chunk = array('i')
+            try:
+                chunk.fromfile(file, 3 * chunk_size)
+            except EOFError:
+                # the last, shorter chunk has still been read
+                pass
+            if not chunk:
+                return
+            yield list(zip(chunk[0::3], chunk[1::3], chunk[2::3]))
+
+
+class SpillSample:
+    """
+    Evenly spaced sample of at most limit of the points added to a group:
+    every stride-th point is kept, and when the sample is full every other
+    point is dropped and the stride doubled. Unlike a random reservoir, the same
+    points always give the same sample.
+    """
+
+    def __init__(self, limit: int = STREAM_SAMPLE) -> None:
+        self.points = []
+        self.count = 0
+        self.stride = 1
+        self.limit = max(2, limit)
+
+    def add(self, point: Point) -> None:
+        if self.count % self.stride == 0:
+            self.points.append(point)
+            if len(self.points) == self.limit:
+                self.points = self.points[::2]
+                self.stride *= 2
+        self.count += 1
+
+
+def stream_ordering(points: Iterable[Point] | str | os.PathLike, memory_budget: int = 10 ** 6,
+                    spill_dir: str | None = None) -> Iterator[Point]:
+    """
+    Lazily yields a balanced insertion order of points, like make_ordering, for
+    point sets too large to hold in memory. points is either an iterable, read
+    once, or the path of a file written by write_points. Coordinates must fit
+    in 32-bit signed integers. At most about memory_budget points are held in
+    memory at once, samples included; the rest are spilled to temporary files
+    in spill_dir (the system default if None).
+
+    Doc: a group that fits in the budget is loaded and yields make_ordering of
+    it. a larger group lives in a file, which is read once to take a SpillSample
+    of at most min(STREAM_SAMPLE, memory_budget // 4) of its points, from which
+    median_split_point chooses the splitting point, yielded first. the file is
+    then read again in chunks and every point is appended to the spill file of
+    its octant, through write buffers flushed after every chunk of a quarter of
+    the budget. the octants are then processed the same way, root first. only
+    the group being split is ever sampled, so the groups waiting on the stack
+    hold nothing but their path and size. a point given more than once is
+    yielded once.
+
+    time complexity: O(n log n) on average, where n is the number of points,
+    reading each point twice and writing it once per level above the budget.
+    :raises ValueError: if memory_budget is not positive
+    """
+    if memory_budget <= 0:
+        raise ValueError('Memory budget must be positive: {0}'.format(memory_budget))
+    chunk_size = max(1, memory_budget // 4)
+    point_size = 3 * array('i').itemsize
+
+    with tempfile.TemporaryDirectory(dir=spill_dir) as directory:
+        spill_names = count()
+
+        def new_spill_path() -> str:
+            return os.path.join(directory, '{0}.bin'.format(next(spill_names)))
+
+        # every group is (path, number of points, whether the file is ours to delete)
+        if isinstance(points, (str, os.PathLike)):
+            stack = [(points, os.path.getsize(points) // point_size, False)]
+        else:
+            iterator = iter(points)
+            buffered = []
+            for point in iterator:
+                buffered.append(point)
+                if len(buffered) > memory_budget:
+                    break
+            else:
+                yield from make_ordering(buffered)
+                return
+            path = new_spill_path()
+            size = 0
+            with open(path, 'wb') as file:
+                while buffered:
+                    size += len(buffered)
+                    array('i', [coordinate for point in buffered for coordinate in point]).tofile(file)
+                    buffered = [point for _, point in zip(range(chunk_size), iterator)]
+            stack = [(path, size, True)]
+
+        while stack:
+            path, size, owned = stack.pop()
+            if size <= memory_budget:
+                group = [point for chunk in read_points(path, chunk_size) for point in chunk]
+                if owned:
+                    os.remove(path)
+                yield from make_ordering(group)
+                continue
+
+            sample = SpillSample(min(STREAM_SAMPLE, memory_budget // 4))
+            for chunk in read_points(path, chunk_size):
+                for point in chunk:
+                    sample.add(point)
+            key = median_split_point(list(dict.fromkeys(sample.points)))
+            del sample
+            yield key
+            x, y, z = key
+            paths = [new_spill_path() for _ in range(8)]
+            sizes = [0] * 8
+            buffers = [array('i') for _ in range(8)]
+            files = [open(octant_path, 'wb') for octant_path in paths]
+            try:
+                for chunk in read_points(path, chunk_size):
+                    for point in chunk:
+                        if point != key:
+                            buffers[(point[0] >= x) + 2 * (point[1] >= y) + 4 * (point[2] >= z)].extend(point)
+                    for octant in range(8):
+                        sizes[octant] += len(buffers[octant]) // 3
+                        buffers[octant].tofile(files[octant])
+                        buffers[octant] = array('i')
+            finally:
+                for file in files:
+                    file.close()
+            if owned:
+                os.remove(path)
+
+            # pushed in reverse so that the octants are output in increasing order
+            for octant in reversed(range(8)):
+                if sizes[octant]:
+                    stack.append((paths[octant], sizes[octant], True))
+                else:
+                    os.remove(paths[octant])
+
+
+def get_size(node: BeeNode | None) -> int:
+    """ Number of points in the subtree of node, 0 for an empty octant. """
+    if node is None:
+        return 0
+    return node.subtree_size
+
+
+# calculates the worst ratio on a 3️⃣🇩🐝🌳, as checked by the balancing tests
+def collect_worst_ratio(node: BeeNode):
+    """
+    Returns (ratio, smaller side, axis) for the worst ratio between the two
+    sides of an axis, over every node of the subtree of node whose larger side
+    holds at least 19 points. Used by the tests and the benchmarks to check
+    the balance of a 3DBT.
+    """
+    default = (1, 0, "")
+    if node is None:
+        return default
+    root_level = node.key
+    neg_x_pos_y_pos_z = node.get_child_for_key((root_level[0] - 1, root_level[1] + 1, root_level[2] + 1))
+    neg_x_pos_y_neg_z = node.get_child_for_key((root_level[0] - 1, root_level[1] + 1, root_level[2] - 1))
+    neg_x_neg_y_pos_z = node.get_child_for_key((root_level[0] - 1, root_level[1] - 1, root_level[2] + 1))
+    neg_x_neg_y_neg_z = node.get_child_for_key((root_level[0] - 1, root_level[1] - 1, root_level[2] - 1))
+    pos_x_pos_y_pos_z = node.get_child_for_key((root_level[0] + 1, root_level[1] + 1, root_level[2] + 1))
+    pos_x_pos_y_neg_z = node.get_child_for_key((root_level[0] + 1, root_level[1] + 1, root_level[2] - 1))
+    pos_x_neg_y_pos_z = node.get_child_for_key((root_level[0] + 1, root_level[1] - 1, root_level[2] + 1))
+    pos_x_neg_y_neg_z = node.get_child_for_key((root_level[0] + 1, root_level[1] - 1, root_level[2] - 1))
+    pos_x = sum(get_size(n) for n in [
+        pos_x_neg_y_neg_z,
+        pos_x_neg_y_pos_z,
+        pos_x_pos_y_neg_z,
+        pos_x_pos_y_pos_z,
+    ])
+    neg_x = sum(get_size(n) for n in [
+        neg_x_neg_y_neg_z,
+        neg_x_neg_y_pos_z,
+        neg_x_pos_y_neg_z,
+        neg_x_pos_y_pos_z,
+    ])
+    pos_y = sum(get_size(n) for n in [
+        neg_x_pos_y_neg_z,
+        neg_x_pos_y_pos_z,
+        pos_x_pos_y_neg_z,
+        pos_x_pos_y_pos_z,
+    ])
+    neg_y = sum(get_size(n) for n in [
+        neg_x_neg_y_neg_z,
+        neg_x_neg_y_pos_z,
+        pos_x_neg_y_neg_z,
+        pos_x_neg_y_pos_z,
+    ])
+    pos_z = sum(get_size(n) for n in [
+        neg_x_neg_y_pos_z,
+        neg_x_pos_y_pos_z,
+        pos_x_neg_y_pos_z,
+        pos_x_pos_y_pos_z,
+    ])
+    neg_z = sum(get_size(n) for n in [
+        neg_x_neg_y_neg_z,
+        neg_x_pos_y_neg_z,
+        pos_x_neg_y_neg_z,
+        pos_x_pos_y_neg_z,
+    ])
+    if pos_x >= 19 or neg_x >= 19:
+        try:
+            default = max(default, (pos_x / neg_x, neg_x, "x"), (neg_x / pos_x, pos_x, "x"))
+        except ZeroDivisionError:
+            default = (float('inf'), (pos_x, neg_x), "x")
+    if pos_y >= 19 or neg_y >= 19:
+        try:
+            default = max(default, (pos_y / neg_y, neg_y, "y"), (neg_y / pos_y, pos_y, "y"))
+        except ZeroDivisionError:
+            default = (float('inf'), (pos_y, neg_y), "y")
+    if pos_z >= 19 or neg_z >= 19:
+        try:
+            default = max(default, (pos_z / neg_z, neg_z, "z"), (neg_z / pos_z, pos_z, "z"))
+        except ZeroDivisionError:
+            default = (float('inf'), (pos_z, neg_z), "z")
+    return max(default, default, *(collect_worst_ratio(child) for child in [
+        neg_x_neg_y_neg_z,
+        neg_x_neg_y_pos_z,
+        neg_x_pos_y_neg_z,
+        neg_x_pos_y_pos_z,
+        pos_x_neg_y_neg_z,
+        pos_x_neg_y_pos_z,
+        pos_x_pos_y_neg_z,
+        pos_x_pos_y_pos_z,
+    ]))
@@ -0,0 +1,522 @@
+""" Benchmarks for the data structures in this assignment.
+
+    Run all of them with ``python benchmarks.py`` or a single one with
+    ``python benchmarks.py <name>``. Use ``-n`` to override the input sizes.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import io
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from bisect import bisect_left
+from collections import deque
+
+from array_bst import ArrayBinarySearchTree
+from avl import AVLTree
+from balancing import collect_worst_ratio, make_ordering, read_points, stream_ordering, write_points
+from bst import BinarySearchTree
+from morton_tree import MortonBeeTree
+from multiset import CountedAVLTree
+from ratio import Percentiles
+from sorting import introsort
+from threedeebeetree import ThreeDeeBeeTree
+
+
+def timed(func, *args) -> float:
+    """ Returns the number of seconds taken by func(*args), with the garbage collector off as in timeit. """
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        # freeing the result is not part of the measurement
+        del result
+        return elapsed
+    finally:
+        gc.enable()
+
+
+def traced_bytes(func, *args) -> int:
+    """ Returns the number of bytes still allocated by func(*args) while its result is alive. """
+    tracemalloc.start()
+    result = func(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def random_points(n: int, span: int = 10 ** 6) -> list[tuple[int, int, int]]:
+    """ n random points with coordinates in [-span, span). """
+    return [(random.randrange(-span, span), random.randrange(-span, span), random.randrange(-span, span))
+            for _ in range(n)]
+
+
+def key_streams(n: int) -> dict[str, list[int]]:
+    """ Sorted, reverse-sorted and random insertion orders of n keys. """
+    keys = list(range(n))
+    shuffled = keys[:]
+    random.shuffle(shuffled)
+    return {'sorted': keys, 'reversed': keys[::-1], 'random': shuffled}
+
+
+def bench_balanced(sizes: list[int]) -> None:
+    """ Insert then look up and rank every key, plain BST against AVL tree. """
+
+    def run(tree_type, keys):
+        tree = tree_type()
+        for key in keys:
+            tree[key] = key
+        for key in keys:
+            _ = tree[key]
+        for k in range(1, len(keys) + 1):
+            tree.kth_smallest(k, tree.root)
+
+    for n in sizes:
+        for stream, keys in key_streams(n).items():
+            for tree_type in (BinarySearchTree, AVLTree):
+                try:
+                    result = '{0:.3f}s'.format(timed(run, tree_type, keys))
+                except RecursionError:
+                    result = 'RecursionError'
+                print('{0:>8} {1:<9} {2:<17} {3}'.format(n, stream, tree_type.__name__, result))
+
+
+def bench_operations(sizes: list[int]) -> None:
+    """ Operations per second of each BinarySearchTree operation on random keys. """
+    for n in sizes:
+        keys = key_streams(n)['random']
+        tree = BinarySearchTree()
+        operations = [
+            ('insert', lambda: [tree.__setitem__(key, key) for key in keys]),
+            ('lookup', lambda: [tree[key] for key in keys]),
+            ('kth_smallest', lambda: [tree.kth_smallest(k, tree.root) for k in range(1, n + 1)]),
+            ('delete', lambda: [tree.__delitem__(key) for key in keys]),
+        ]
+        for name, operation in operations:
+            print('{0:>8} {1:<13} {2:>10.0f} ops/s'.format(n, name, n / timed(operation)))
+
+
+def bench_bulk_load(sizes: list[int]) -> None:
+    """ Repeated __setitem__ against from_items on unsorted and presorted input. """
+
+    def insert_all(pairs):
+        tree = BinarySearchTree()
+        for key, item in pairs:
+            tree[key] = item
+
+    for n in sizes:
+        pairs = [(key, key) for key in key_streams(n)['random']]
+        sorted_pairs = sorted(pairs)
+        print('{0:>8} {1:<26} {2:.3f}s'.format(n, '__setitem__ (random)', timed(insert_all, pairs)))
+        print('{0:>8} {1:<26} {2:.3f}s'.format(n, 'from_items', timed(BinarySearchTree.from_items, pairs)))
+        print('{0:>8} {1:<26} {2:.3f}s'.format(n, 'from_items (presorted)',
+                                               timed(BinarySearchTree.from_items, sorted_pairs, True)))
+
+
+def bench_memory(sizes: list[int]) -> None:
+    """ Bytes allocated per node by a BinarySearchTree and a ThreeDeeBeeTree, keys included. """
+
+    def build_3dbt(points):
+        tree = ThreeDeeBeeTree()
+        for point in points:
+            tree[point] = None
+        return tree
+
+    for n in sizes:
+        pairs = [(key, None) for key in range(n)]
+        points = random_points(n)
+        bst_bytes = traced_bytes(BinarySearchTree.from_items, pairs, True)
+        tdbt_bytes = traced_bytes(build_3dbt, points)
+        print('{0:>8} {1:<17} {2:>7.1f} bytes/node'.format(n, 'BinarySearchTree', bst_bytes / n))
+        print('{0:>8} {1:<17} {2:>7.1f} bytes/node'.format(n, 'ThreeDeeBeeTree', tdbt_bytes / n))
+
+
+def bench_engines(sizes: list[int]) -> None:
+    """ Linked BinarySearchTree against the array-backed engine: build, lookups and memory. """
+
+    def build(tree_type, keys):
+        tree = tree_type()
+        for key in keys:
+            tree[key] = key
+        return tree
+
+    def lookup(tree, keys):
+        for key in keys:
+            _ = tree[key]
+
+    engines = [('BinarySearchTree', BinarySearchTree),
+               ('ArrayBinarySearchTree', lambda: ArrayBinarySearchTree('q'))]
+    for n in sizes:
+        keys = key_streams(n)['random']
+        for name, tree_type in engines:
+            build_time = timed(build, tree_type, keys)
+            tree = build(tree_type, keys)
+            lookup_time = timed(lookup, tree, keys)
+            size = traced_bytes(build, tree_type, keys)
+            print('{0:>8} {1:<22} build {2:.3f}s lookup {3:.3f}s {4:>6.1f} bytes/node'.format(
+                n, name, build_time, lookup_time, size / n))
+
+
+def bench_batched(sizes: list[int]) -> None:
+    """ Per-key cost of get_many/contains_many/update against one call per key, on a 10^5 key tree. """
+    n = 10 ** 5
+    tree = BinarySearchTree.from_items((key, key) for key in key_streams(n)['random'])
+    for size in sizes:
+        batch = random.sample(range(n), size)
+        new_pairs = [(n + key, key) for key in random.sample(range(n), size)]
+        print('{0:>8} {1:<32} {2:>7.2f} us/key'.format(size, 'tree[key] loop',
+              timed(lambda: [tree[key] for key in batch]) / size * 1e6))
+        print('{0:>8} {1:<32} {2:>7.2f} us/key'.format(size, 'get_many',
+              timed(tree.get_many, batch) / size * 1e6))
+        print('{0:>8} {1:<32} {2:>7.2f} us/key'.format(size, 'key in tree loop',
+              timed(lambda: [key in tree for key in batch]) / size * 1e6))
+        print('{0:>8} {1:<32} {2:>7.2f} us/key'.format(size, 'contains_many',
+              timed(tree.contains_many, batch) / size * 1e6))
+        copy = BinarySearchTree.from_items(tree.items(), presorted=True)
+        print('{0:>8} {1:<32} {2:>7.2f} us/key'.format(size, 'tree[key] = item loop (new keys)',
+              timed(lambda: [copy.__setitem__(key, item) for key, item in new_pairs]) / size * 1e6))
+        copy = BinarySearchTree.from_items(tree.items(), presorted=True)
+        print('{0:>8} {1:<32} {2:>7.2f} us/key'.format(size, 'update (new keys)',
+              timed(copy.update, new_pairs) / size * 1e6))
+
+
+def bench_split(sizes: list[int]) -> None:
+    """ Dropping every key below the median with __delitem__ against a single split. """
+    for n in sizes:
+        for tree_type in (BinarySearchTree, AVLTree):
+            tree = tree_type.from_items((key, key) for key in range(n))
+            delete_time = timed(lambda: [tree.__delitem__(key) for key in range(n // 2)])
+            tree = tree_type.from_items((key, key) for key in range(n))
+            split_time = timed(tree.split, n // 2)
+            print('{0:>8} {1:<17} __delitem__ {2:.4f}s split {3:.6f}s'.format(
+                n, tree_type.__name__, delete_time, split_time))
+
+
+def bench_box(sizes: list[int]) -> None:
+    """ query_box and count_box against filtering every point, for boxes a fifth of the space wide on each axis. """
+    span = 10 ** 6
+    for n in sizes:
+        points = random_points(n, span)
+        tree = ThreeDeeBeeTree()
+        for point in points:
+            tree[point] = point
+        boxes = []
+        for _ in range(20):
+            lo = tuple(random.randrange(-span, span - span // 2) for _ in range(3))
+            boxes.append((lo, tuple(coordinate + span * 2 * 0.2 for coordinate in lo)))
+
+        def brute_force():
+            for lo, hi in boxes:
+                [p for p in points if all(lo[axis] <= p[axis] <= hi[axis] for axis in range(3))]
+
+        print('{0:>8} {1:<12} {2:.4f}s'.format(n, 'brute force', timed(brute_force)))
+        print('{0:>8} {1:<12} {2:.4f}s'.format(n, 'query_box', timed(
+            lambda: [list(tree.query_box(lo, hi)) for lo, hi in boxes])))
+        print('{0:>8} {1:<12} {2:.4f}s'.format(n, 'count_box', timed(
+            lambda: [tree.count_box(lo, hi) for lo, hi in boxes])))
+
+
+def bench_nearest(sizes: list[int]) -> None:
+    """ nearest and within_radius against sorting every point by distance, 100 queries each. """
+    span = 10 ** 6
+    for n in sizes:
+        points = random_points(n, span)
+        tree = ThreeDeeBeeTree()
+        for point in points:
+            tree[point] = point
+        queries = random_points(100, span)
+        radius = span // 10
+
+        def distance(a, b):
+            return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+        def brute_force():
+            for query in queries:
+                sorted(points, key=lambda p: distance(p, query))[:10]
+                [p for p in points if distance(p, query) <= radius * radius]
+
+        print('{0:>8} {1:<24} {2:.4f}s'.format(n, 'brute force (both)', timed(brute_force)))
+        print('{0:>8} {1:<24} {2:.4f}s'.format(n, 'nearest(k=10)', timed(
+            lambda: [tree.nearest(query, 10) for query in queries])))
+        print('{0:>8} {1:<24} {2:.4f}s'.format(n, 'within_radius', timed(
+            lambda: [list(tree.within_radius(query, radius)) for query in queries])))
+
+
+def bench_from_points(sizes: list[int]) -> None:
+    """ Building a ThreeDeeBeeTree with from_points against make_ordering then inserting, and random inserts. """
+
+    def insert_all(points):
+        tree = ThreeDeeBeeTree()
+        for point in points:
+            tree[point] = point
+        return tree
+
+    builds = [
+        ('random inserts', insert_all),
+        ('make_ordering + inserts', lambda points: insert_all(make_ordering(points))),
+        ('from_points', lambda points: ThreeDeeBeeTree.from_points((point, point) for point in points)),
+    ]
+    for n in sizes:
+        points = list(set(random_points(n)))
+        for name, build in builds:
+            build_time = timed(build, points)
+            ratio, _, axis = collect_worst_ratio(build(points).root)
+            print('{0:>8} {1:<24} {2:.3f}s worst ratio {3:.2f} ({4})'.format(n, name, build_time, ratio, axis))
+
+
+def bench_make_ordering(sizes: list[int]) -> None:
+    """ Time taken by make_ordering and the worst ratio of the tree built by inserting its output. """
+    for n in sizes:
+        points = random_points(n)
+        ordering_time = timed(make_ordering, points)
+        tree = ThreeDeeBeeTree()
+        for point in make_ordering(points):
+            tree[point] = None
+        ratio, _, axis = collect_worst_ratio(tree.root)
+        print('{0:>8} make_ordering {1:.3f}s worst ratio {2:.2f} ({3})'.format(n, ordering_time, ratio, axis))
+
+
+def bench_stream_ordering(sizes: list[int]) -> None:
+    """ stream_ordering of a file of points under a memory budget of a tenth of them, against make_ordering. """
+
+    def peak_bytes(func, *args) -> int:
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            points = random_points(n)
+            path = os.path.join(directory, 'points.bin')
+            write_points(path, points)
+            runs = [
+                ('make_ordering', lambda: make_ordering([p for chunk in read_points(path, n) for p in chunk])),
+                ('stream_ordering', lambda: deque(stream_ordering(path, n // 10, directory), maxlen=0)),
+            ]
+            for name, run in runs:
+                print('{0:>8} {1:<16} {2:.3f}s peak {3:>6.1f} MB'.format(
+                    n, name, timed(run), peak_bytes(run) / 2 ** 20))
+
+
+def bench_parallel_ordering(sizes: list[int]) -> None:
+    """ make_ordering with 1, 2, 4 and 8 worker processes. """
+    for n in sizes:
+        points = random_points(n)
+        serial = timed(make_ordering, points)
+        for workers in (1, 2, 4, 8):
+            elapsed = serial if workers == 1 else timed(make_ordering, points, workers)
+            print('{0:>8} {1} workers {2:.3f}s speedup {3:.2f}x'.format(n, workers, elapsed, serial / elapsed))
+
+
+def bench_percentiles(sizes: list[int]) -> None:
+    """ Percentiles under a sliding window of n points against a list sorted on every query. """
+    for n in sizes:
+        stream = [random.randrange(10 ** 6) for _ in range(2 * n)]
+
+        def tree_window():
+            p = Percentiles()
+            for point in stream[:n]:
+                p.add_point(point)
+            for i in range(n, 2 * n):
+                p.add_point(stream[i])
+                p.remove_point(stream[i - n])
+                if i % 1000 == 0:
+                    list(p.ratio(49, 50))
+
+        def list_window():
+            points = []
+            for point in stream[:n]:
+                points.append(point)
+            for i in range(n, 2 * n):
+                points.append(stream[i])
+                points.remove(stream[i - n])
+                if i % 1000 == 0:
+                    sorted(points)[n * 49 // 100:-(n // 2)]
+
+        print('{0:>8} {1:<12} {2:.3f}s'.format(n, 'Percentiles', timed(tree_window)))
+        print('{0:>8} {1:<12} {2:.3f}s'.format(n, 'sorted list', timed(list_window)))
+
+
+def bench_multiset(sizes: list[int]) -> None:
+    """ Adding n integer latencies with 1000 distinct values to a CountedAVLTree against one AVLTree node per point. """
+
+    def node_per_point(values):
+        tree = AVLTree()
+        for i, value in enumerate(values):
+            tree[(value, i)] = None
+        return tree
+
+    def counted(values):
+        tree = CountedAVLTree()
+        for value in values:
+            tree.add(value)
+        return tree
+
+    for n in sizes:
+        values = [random.randrange(1000) for _ in range(n)]
+        for name, build in (('node per point', node_per_point), ('CountedAVLTree', counted)):
+            print('{0:>8} {1:<15} {2:.3f}s {3:>8.1f} KB'.format(
+                n, name, timed(build, values), traced_bytes(build, values) / 1024))
+
+
+def bench_sketch(sizes: list[int]) -> None:
+    """ Percentiles in sketch mode of several sizes against the exact mode: memory, time and rank error of boundaries. """
+    for n in sizes:
+        stream = [random.random() for _ in range(n)]
+        data = sorted(stream)
+        queries = [(x, 100 - x - 1) for x in range(1, 99, 7)]
+
+        def build(sketch_size):
+            p = Percentiles(sketch_size, seed=1008)
+            for point in stream:
+                p.add_point(point)
+            return p
+
+        for sketch_size in (None, 50, 200, 1000):
+            p = build(sketch_size)
+            worst = 0
+            for x, y in queries:
+                start, stop = p.ratio_ranks(x, y)
+                lo, hi = p.boundaries(x, y)
+                worst = max(worst, abs(bisect_left(data, lo) - start), abs(bisect_left(data, hi) - (stop - 1)))
+            print('{0:>8} {1:<13} {2:.3f}s {3:>9.1f} KB error {4:.4f} bound {5:.4f}'.format(
+                n, 'exact' if sketch_size is None else 'sketch k={0}'.format(sketch_size),
+                timed(build, sketch_size), traced_bytes(build, sketch_size) / 1024, worst / n, p.error_bound()))
+
+
+def bench_ratio_cache(sizes: list[int]) -> None:
+    """ 20 ratio calls after every 10 updates of n points, reading the cached prefix counts against walking the multiset. """
+    for n in sizes:
+        p = Percentiles()
+        for _ in range(n):
+            p.add_point(random.randrange(10 ** 6))
+        start, stop = p.ratio_ranks(25, 25)
+
+        def queries(ratio):
+            for _ in range(20):
+                for _ in range(5):
+                    p.add_point(random.randrange(10 ** 6))
+                    p.remove_point(p.points.select(random.randrange(len(p))).key)
+                for _ in range(20):
+                    list(ratio())
+
+        print('{0:>8} {1:<12} {2:.3f}s'.format(n, 'elements', timed(lambda: queries(lambda: p.points.elements(start, stop)))))
+        print('{0:>8} {1:<12} {2:.3f}s  hits {3} patches {4} rebuilds {5}'.format(
+            n, 'cached', timed(lambda: queries(lambda: p.ratio(25, 25))),
+            p.cache_hits, p.cache_patches, p.cache_rebuilds))
+        print('{0:>8} {1:<12} {2:.6f}s'.format(n, 'median, cached', timed(lambda: list(p.ratio(49, 50)))))
+        p.add_point(0)
+        print('{0:>8} {1:<12} {2:.6f}s'.format(n, 'median after an update', timed(lambda: list(p.ratio(49, 50)))))
+        p.keys = None
+        print('{0:>8} {1:<12} {2:.6f}s'.format(n, 'median after a rebuild', timed(lambda: list(p.ratio(49, 50)))))
+
+
+def bench_sorting(sizes: list[int]) -> None:
+    """ introsort against the list comprehension quicksort Percentiles.quicksort used, and list.sort. """
+
+    def list_quicksort(arr):
+        if len(arr) <= 1:
+            return arr
+        pivot = arr[len(arr) // 2]
+        return (list_quicksort([x for x in arr if x < pivot]) + [x for x in arr if x == pivot]
+                + list_quicksort([x for x in arr if x > pivot]))
+
+    for n in sizes:
+        inputs = {
+            'random': [random.randrange(10 ** 9) for _ in range(n)],
+            'sorted': list(range(n)),
+            'duplicates': [random.randrange(10) for _ in range(n)],
+        }
+        for kind, values in inputs.items():
+            print('{0:>8} {1:<11} {2:<14} {3:.3f}s'.format(n, kind, 'list quicksort', timed(lambda: list_quicksort(values))))
+            print('{0:>8} {1:<11} {2:<14} {3:.3f}s'.format(n, kind, 'introsort', timed(lambda: introsort(list(values)))))
+            print('{0:>8} {1:<11} {2:<14} {3:.3f}s'.format(n, kind, 'list.sort', timed(lambda: sorted(values))))
+
+
+def bench_tdbt_operations(sizes: list[int]) -> None:
+    """ Inserts and lookups per second on a ThreeDeeBeeTree of random points. """
+    for n in sizes:
+        points = list(set(random_points(n)))
+        tree = ThreeDeeBeeTree()
+        insert_time = timed(lambda: [tree.__setitem__(point, point) for point in points])
+        lookup_time = timed(lambda: [tree[point] for point in points])
+        print('{0:>8} insert {1:>8.0f} ops/s lookup {2:>8.0f} ops/s'.format(
+            n, len(points) / insert_time, len(points) / lookup_time))
+
+
+def bench_morton(sizes: list[int]) -> None:
+    """ MortonBeeTree against ThreeDeeBeeTree: memory, build, lookups and box queries, plus save and load. """
+    span = 10 ** 6
+    backends = [
+        ('ThreeDeeBeeTree', lambda pairs: ThreeDeeBeeTree.from_points(pairs)),
+        ('MortonBeeTree', lambda pairs: MortonBeeTree.from_points(pairs)),
+    ]
+    for n in sizes:
+        pairs = [(point, None) for point in set(random_points(n, span))]
+        boxes = []
+        for _ in range(20):
+            lo = tuple(random.randrange(-span, span - span // 2) for _ in range(3))
+            boxes.append((lo, tuple(coordinate + span * 2 // 5 for coordinate in lo)))
+        for name, build in backends:
+            tree_bytes = traced_bytes(build, pairs)
+            build_time = timed(build, pairs)
+            tree = build(pairs)
+            lookup_time = timed(lambda: [tree[point] for point, _ in pairs])
+            box_time = timed(lambda: [list(tree.query_box(lo, hi)) for lo, hi in boxes])
+            count_time = timed(lambda: [tree.count_box(lo, hi) for lo, hi in boxes])
+            print('{0:>8} {1:<16} {2:>6.1f} bytes/point build {3:.3f}s lookups {4:.3f}s '
+                  'query_box {5:.4f}s count_box {6:.4f}s'.format(
+                      n, name, tree_bytes / len(pairs), build_time, lookup_time, box_time, count_time))
+        buffer = io.BytesIO()
+        save_time = timed(tree.save, buffer)
+        buffer.seek(0)
+        load_time = timed(MortonBeeTree.load, buffer)
+        print('{0:>8} {1:<16} save {2:.4f}s load {3:.4f}s ({4} bytes)'.format(
+            n, 'MortonBeeTree', save_time, load_time, len(buffer.getvalue())))
+
+
+BENCHMARKS = {
+    'balanced': (bench_balanced, [500, 5000]),
+    'operations': (bench_operations, [10 ** 5, 10 ** 6]),
+    'bulk_load': (bench_bulk_load, [10 ** 5, 10 ** 6]),
+    'memory': (bench_memory, [10 ** 5]),
+    'engines': (bench_engines, [10 ** 5]),
+    'batched': (bench_batched, [10, 1000, 10 ** 5]),
+    'split': (bench_split, [10 ** 5, 10 ** 6]),
+    'box': (bench_box, [10 ** 4, 10 ** 5]),
+    'nearest': (bench_nearest, [10 ** 4, 10 ** 5]),
+    'from_points': (bench_from_points, [10 ** 4, 10 ** 5]),
+    'make_ordering': (bench_make_ordering, [10 ** 5, 10 ** 6]),
+    'stream_ordering': (bench_stream_ordering, [10 ** 5, 10 ** 6]),
+    'parallel_ordering': (bench_parallel_ordering, [10 ** 5, 10 ** 6]),
+    'percentiles': (bench_percentiles, [10 ** 4, 10 ** 5]),
+    'multiset': (bench_multiset, [10 ** 5, 10 ** 6]),
+    'sketch': (bench_sketch, [10 ** 5, 10 ** 6]),
+    'ratio_cache': (bench_ratio_cache, [10 ** 4, 10 ** 5]),
+    'sorting': (bench_sorting, [10 ** 4, 10 ** 5]),
+    'tdbt_operations': (bench_tdbt_operations, [10 ** 5, 10 ** 6]),
+    'morton': (bench_morton, [10 ** 5, 10 ** 6]),
+}
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('benchmark', nargs='?', default='', choices=[''] + list(BENCHMARKS),
+                   help='The benchmark to run. Leave blank for all benchmarks.')
+    p.add_argument('-n', '--sizes', type=int, nargs='+', help='Input sizes to benchmark.')
+    args = p.parse_args()
+
+    random.seed(1008)
+    for name, (bench, sizes) in BENCHMARKS.items():
+        if args.benchmark in ('', name):
+            print('== {0} =='.format(name))
+            bench(args.sizes or sizes)
@@ -8,7 +8,8 @@ from __future__ import annotations
 __author__ = 'Brendon Taylor, modified by Alexey Ignatiev, further modified by Jackson Goerner'
 __docformat__ = 'reStructuredText'
 
-from typing import TypeVar, Generic
+from bisect import bisect_left, bisect_right
+from typing import TypeVar, Generic, Iterable, Iterator, Mapping
 from node import TreeNode
 import sys
 
@@ -31,6 +32,67 @@ class BinarySearchTree(Generic[K, I]):
         self.root = None
         self.length = 0
 
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[K, I]], presorted: bool = False) -> BinarySearchTree[K, I]:
+        """
+            Builds a perfectly balanced tree from an iterable of (key, item) pairs.
+
+            Doc: the pairs are sorted once by key (skipped when presorted is True)
+            and then build_balanced makes the middle pair of every range the root
+            of its sub-tree, computing subtree sizes bottom-up. Keys must be
+            distinct, and when presorted is True they must already be increasing.
+
+            :complexity: O(n log n * CompK) to sort, O(n) when presorted,
+            where n is the number of pairs
+            :raises ValueError: if a key is repeated or presorted keys are out of order
+        """
+        pairs = list(items)
+        if not presorted:
+            pairs.sort(key=lambda pair: pair[0])
+        for i in range(1, len(pairs)):
+            if pairs[i - 1][0] == pairs[i][0]:
+                raise ValueError('Inserting duplicate item')
+            elif pairs[i][0] < pairs[i - 1][0]:
+                raise ValueError('Items are not sorted by key')
+
+        tree = cls()
+        tree.root = tree.build_balanced(pairs, 0, len(pairs))
+        tree.length = len(pairs)
+        return tree
+
+    def build_balanced(self, pairs: list[tuple[K, I]], lo: int, hi: int) -> TreeNode | None:
+        """
+            Builds a balanced sub-tree out of the sorted pairs[lo:hi] and returns its root.
+            :complexity: O(hi - lo), the recursion is only O(log(hi - lo)) deep
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        current = self.create_node(pairs[mid][0], pairs[mid][1])
+        current.left = self.build_balanced(pairs, lo, mid)
+        current.right = self.build_balanced(pairs, mid + 1, hi)
+        self.update_node(current)
+        return current
+
+    def create_node(self, key: K, item: I) -> TreeNode:
+        """
+            Creates a node of the type used by this tree.
+            :complexity: O(1)
+        """
+        return TreeNode(key, item=item)
+
+    def update_node(self, current: TreeNode) -> None:
+        """
+            Recompute the subtree size of current from its children.
+            :complexity: O(1)
+        """
+        size = 1
+        if current.left is not None:
+            size += current.left.subtree_size
+        if current.right is not None:
+            size += current.right.subtree_size
+        current.subtree_size = size
+
     def is_empty(self) -> bool:
         """
             Checks to see if the bst is empty
@@ -68,77 +130,330 @@ class BinarySearchTree(Generic[K, I]):
         return self.get_tree_node_by_key_aux(self.root, key)
 
     def get_tree_node_by_key_aux(self, current: TreeNode, key: K) -> TreeNode:
-        if current is None:
-            raise KeyError('Key not found: {0}'.format(key))
-        elif key == current.key:
-            return current
-        elif key < current.key:
-            return self.get_tree_node_by_key_aux(current.left, key)
-        else:  # key > current.key
-            return self.get_tree_node_by_key_aux(current.right, key)
+        """
+            Walks down from current to the node holding key without recursion.
+            :complexity best: O(CompK) finds the key at current
+            :complexity worst: O(CompK * D) key is not found, where D is the depth of the tree
+        """
+        while current is not None:
+            if key == current.key:
+                return current
+            elif key < current.key:
+                current = current.left
+            else:  # key > current.key
+                current = current.right
+        raise KeyError('Key not found: {0}'.format(key))
+
+    def get_many(self, keys: Iterable[K]) -> list[I]:
+        """
+            Returns the items of all the given keys, in the order they were given.
+            :complexity: see get_tree_nodes_by_keys
+            :raises KeyError: if any of the keys is not in the tree
+        """
+        keys = list(keys)
+        items = []
+        for key, node in zip(keys, self.get_tree_nodes_by_keys(keys)):
+            if node is None:
+                raise KeyError('Key not found: {0}'.format(key))
+            items.append(node.item)
+        return items
+
+    def contains_many(self, keys: Iterable[K]) -> list[bool]:
+        """
+            Checks which of the given keys are in the tree, in the order they were given.
+            :complexity: see get_tree_nodes_by_keys
+        """
+        return [node is not None for node in self.get_tree_nodes_by_keys(keys)]
+
+    def get_tree_nodes_by_keys(self, keys: Iterable[K]) -> list[TreeNode | None]:
+        """
+            Finds the nodes of a whole batch of keys, None for keys not in the tree.
+
+            Doc: the batch is sorted once. a single traversal then carries a
+            range of the sorted batch down from the root: at each node the range
+            is split with bisect into the keys below, equal to and above the
+            node's key, so the path prefixes shared by several keys are walked
+            only once and a subtree is skipped as soon as no key is left for it.
+            a range down to a single key is finished with a plain walk.
+
+            :complexity: O(CompK * (m log m + V log m)) where m is the size of the
+            batch and V <= m * D is the number of nodes visited, D being the depth of the tree
+        """
+        keys = list(keys)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        sorted_keys = [keys[i] for i in order]
+        nodes = [None] * len(keys)
+
+        stack = [(self.root, 0, len(keys))]
+        while stack:
+            current, lo, hi = stack.pop()
+            if current is None or lo >= hi:
+                continue
+            if hi - lo == 1:
+                # a lone key no longer shares its path, finish it with a plain walk
+                key = sorted_keys[lo]
+                while current is not None and key != current.key:
+                    current = current.left if key < current.key else current.right
+                nodes[order[lo]] = current
+                continue
+            start = bisect_left(sorted_keys, current.key, lo, hi)
+            end = bisect_right(sorted_keys, current.key, start, hi)
+            for i in range(start, end):
+                nodes[order[i]] = current
+            stack.append((current.left, lo, start))
+            stack.append((current.right, end, hi))
+        return nodes
+
+    def update(self, items: Mapping[K, I] | Iterable[tuple[K, I]]) -> None:
+        """
+            Sets every (key, item) pair of a mapping or iterable of pairs,
+            replacing the item of keys already in the tree like dict.update.
+            When a key is repeated the last pair wins.
+
+            Doc: the pairs are sorted once and looked up together with
+            get_tree_nodes_by_keys. the existing keys get their items replaced
+            and the new ones are handed, still sorted, to insert_sorted.
+
+            :complexity: O(CompK * m log m) plus the cost of get_tree_nodes_by_keys
+            and insert_sorted, where m is the number of pairs
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+        pairs = sorted(items, key=lambda pair: pair[0])
+        unique = []
+        for pair in pairs:
+            if unique and unique[-1][0] == pair[0]:
+                unique[-1] = pair
+            else:
+                unique.append(pair)
+
+        new_pairs = []
+        nodes = self.get_tree_nodes_by_keys(key for key, _ in unique)
+        for pair, node in zip(unique, nodes):
+            if node is None:
+                new_pairs.append(pair)
+            else:
+                node.item = pair[1]
+        self.insert_sorted(new_pairs)
+
+    def insert_sorted(self, pairs: list[tuple[K, I]]) -> None:
+        """
+            Inserts a batch of new (key, item) pairs, sorted by key, none of which
+            may already be in the tree.
+
+            Doc: like get_tree_nodes_by_keys a range of the batch is carried down
+            from the root and split at every node, whose subtree_size grows by the
+            size of its range. a range reaching an empty child is turned into a
+            balanced sub-tree with build_balanced and hung there.
+
+            :complexity: O(CompK * (m + V log m)) where m is the size of the
+            batch and V <= m * D is the number of nodes visited, D being the depth of the tree
+        """
+        keys = [key for key, _ in pairs]
+        if self.root is None:
+            self.root = self.build_balanced(pairs, 0, len(pairs))
+            self.length += len(pairs)
+            return
+
+        stack = [(self.root, 0, len(pairs))]
+        while stack:
+            current, lo, hi = stack.pop()
+            current.subtree_size += hi - lo
+            split = bisect_left(keys, current.key, lo, hi)
+            if lo < split:
+                if current.left is None:
+                    current.left = self.build_balanced(pairs, lo, split)
+                else:
+                    stack.append((current.left, lo, split))
+            if split < hi:
+                if current.right is None:
+                    current.right = self.build_balanced(pairs, split, hi)
+                else:
+                    stack.append((current.right, split, hi))
+        self.length += len(pairs)
 
     def __setitem__(self, key: K, item: I) -> None:
         self.root = self.insert_aux(self.root, key, item)
 
-# edit here for task 1 b to have the subtree.size being updated
     def insert_aux(self, current: TreeNode, key: K, item: I) -> TreeNode:
         """
             Attempts to insert an item into the tree, it uses the Key to insert it
+            and returns the root of the updated sub-tree.
+
+            Doc: the nodes visited on the way down are kept on an explicit
+            parent stack, so once the new leaf is attached every ancestor has
+            its subtree_size bumped without using a Python frame per level.
+            A duplicate key raises before any size is touched.
+
             :complexity best: O(CompK) inserts the item at the root.
             :complexity worst: O(CompK * D) inserting at the bottom of the tree
             where D is the depth of the tree
             CompK is the complexity of comparing the keys
         """
-        if current is None:  # base case: at the leaf
-            current = TreeNode(key, item=item)
+        if current is None:  # empty sub-tree: the new node is its root
             self.length += 1
-        elif key < current.key:
-            current.left = self.insert_aux(current.left, key, item)
-            current.subtree_size += 1
-        elif key > current.key:
-            current.right = self.insert_aux(current.right, key, item)
-            current.subtree_size += 1
-        else:  # key == current.key
-            raise ValueError('Inserting duplicate item')
+            return self.create_node(key, item)
+
+        path = []
+        node = current
+        while node is not None:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                node = node.right
+            else:  # key == node.key
+                raise ValueError('Inserting duplicate item')
+
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = self.create_node(key, item)
+        else:
+            parent.right = self.create_node(key, item)
+        for node in path:
+            node.subtree_size += 1
+        self.length += 1
         return current
 
     def __delitem__(self, key: K) -> None:
         self.root = self.delete_aux(self.root, key)
 
-# edited here to have current.subtree.size to minus
     def delete_aux(self, current: TreeNode, key: K) -> TreeNode:
         """
             Attempts to delete an item from the tree, it uses the Key to
-            determine the node to delete.
-        """
+            determine the node to delete and returns the root of the updated sub-tree.
 
-        if current is None:  # key not found
+            Doc: as in insert_aux the ancestors are kept on a parent stack.
+            A node with two children takes the key and item of its successor,
+            which is then unlinked instead; every node on the stack loses one
+            from its subtree_size.
+
+            :complexity best: O(CompK) deletes the root when it has at most one child
+            :complexity worst: O(CompK * D) where D is the depth of the tree
+        """
+        path = []
+        node = current
+        while node is not None and key != node.key:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            else:  # key > node.key
+                node = node.right
+        if node is None:  # key not found
             raise ValueError('Deleting non-existent item')
-        elif key < current.key:
-            current.left  = self.delete_aux(current.left, key)
-            current.subtree_size -= 1
-        elif key > current.key:
-            current.right = self.delete_aux(current.right, key)
-            current.subtree_size -= 1
-        else:  # we found our key => do actual deletion
-            if self.is_leaf(current):
-                self.length -= 1
-                return None
-            elif current.left is None:
-                self.length -= 1
-                return current.right
-            elif current.right is None:
-                self.length -= 1
-                return current.left
 
+        if node.left is not None and node.right is not None:
             # general case => find a successor
-            succ = self.get_successor(current)
-            current.key  = succ.key
-            current.item = succ.item
-            current.right = self.delete_aux(current.right, succ.key)
-            current.subtree_size -= 1
+            path.append(node)
+            succ = node.right
+            while succ.left is not None:
+                path.append(succ)
+                succ = succ.left
+            node.key = succ.key
+            node.item = succ.item
+            node, replacement = succ, succ.right
+        elif node.left is None:
+            replacement = node.right
+        else:
+            replacement = node.left
+
+        if not path:
+            current = replacement
+        elif path[-1].left is node:
+            path[-1].left = replacement
+        else:
+            path[-1].right = replacement
+        for ancestor in path:
+            ancestor.subtree_size -= 1
+        self.length -= 1
         return current
 
+    def split(self, key: K) -> tuple[BinarySearchTree[K, I], BinarySearchTree[K, I]]:
+        """
+            Splits the tree into a tree with the keys smaller than key and a
+            tree with the keys greater than or equal to it. The nodes are moved,
+            not copied, so this tree is left empty.
+
+            Doc: the path from the root towards key is walked once. going back
+            up that path, every node whose key is smaller than key is joined
+            with its left subtree and the smaller part built so far (which
+            hangs off its right), and every other node with the greater part
+            built so far and its right subtree, using join_aux.
+
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        path = []
+        current = self.root
+        while current is not None:
+            path.append(current)
+            if current.key < key:
+                current = current.right
+            else:
+                current = current.left
+
+        smaller = greater = None
+        for current in reversed(path):
+            if current.key < key:
+                smaller = self.join_aux(current.left, current, smaller)
+            else:
+                greater = self.join_aux(greater, current, current.right)
+
+        self.root = None
+        self.length = 0
+        return self.tree_from_root(smaller), self.tree_from_root(greater)
+
+    @classmethod
+    def join(cls, left: BinarySearchTree[K, I], right: BinarySearchTree[K, I]) -> BinarySearchTree[K, I]:
+        """
+            Joins two trees where every key of left is smaller than every key of
+            right. The nodes are moved, not copied, so both trees are left empty.
+
+            Doc: the smallest key of right is deleted from it and becomes the
+            node that join_aux puts between the two trees.
+
+            :complexity: O(CompK * (D1 + D2)) where D1 and D2 are the depths of the trees
+            :raises ValueError: if the keys of the trees overlap
+        """
+        tree = cls()
+        if right.root is None:
+            root = left.root
+        else:
+            minimal = right.get_minimal(right.root)
+            if left.root is not None:
+                maximal = left.root
+                while maximal.right is not None:
+                    maximal = maximal.right
+                if not maximal.key < minimal.key:
+                    raise ValueError('Keys of the joined trees overlap')
+            right_root = right.delete_aux(right.root, minimal.key)
+            root = tree.join_aux(left.root, tree.create_node(minimal.key, minimal.item), right_root)
+
+        left.root, left.length = None, 0
+        right.root, right.length = None, 0
+        return tree.tree_from_root(root)
+
+    def join_aux(self, left: TreeNode | None, current: TreeNode, right: TreeNode | None) -> TreeNode:
+        """
+            Returns the root of a sub-tree holding left, then current, then right,
+            where all keys of left are smaller than current.key and all keys of
+            right are greater. Here current simply becomes the root.
+            :complexity: O(1)
+        """
+        current.left = left
+        current.right = right
+        self.update_node(current)
+        return current
+
+    def tree_from_root(self, root: TreeNode | None) -> BinarySearchTree[K, I]:
+        """
+            Wraps a sub-tree in a new tree of the same type as this one.
+            :complexity: O(1)
+        """
+        tree = type(self)()
+        tree.root = root
+        tree.length = root.subtree_size if root is not None else 0
+        return tree
+
     def get_successor(self, current: TreeNode) -> TreeNode:
         """
             Get successor of the current node.
@@ -210,64 +525,256 @@ class BinarySearchTree(Generic[K, I]):
 
         return current.left is None and current.right is None
 
+    def __iter__(self) -> Iterator[K]:
+        """
+            Iterates over the keys in increasing order.
+            :complexity: O(1) per key on average, O(D) for the first one
+        """
+        return self.keys()
+
+    def keys(self, lo: K | None = None, hi: K | None = None, reverse: bool = False) -> Iterator[K]:
+        """
+            Lazily yields the keys k with lo <= k <= hi, see items().
+        """
+        for key, _ in self.items(lo, hi, reverse):
+            yield key
+
+    def items(self, lo: K | None = None, hi: K | None = None, reverse: bool = False) -> Iterator[tuple[K, I]]:
+        """
+            Lazily yields the (key, item) pairs with lo <= key <= hi in increasing
+            order of key, or decreasing order if reverse is True.
+            A bound of None leaves that side of the range open.
+
+            Doc: the in-order walk keeps the pending ancestors on an explicit
+            stack. whenever a node falls below lo (above hi when reversed) it
+            and its whole left (right) subtree are skipped without being pushed,
+            and the walk stops at the first key past the other bound, so only
+            the subtrees overlapping the range are visited.
+
+            :complexity: O(D + m) in total, where D is the depth of the tree
+            and m is the number of pairs yielded
+        """
+        if reverse:
+            yield from self.items_reversed(lo, hi)
+            return
+
+        stack = []
+        current = self.root
+        while stack or current is not None:
+            if current is not None:
+                if lo is not None and current.key < lo:
+                    current = current.right
+                else:
+                    stack.append(current)
+                    current = current.left
+            else:
+                current = stack.pop()
+                if hi is not None and current.key > hi:
+                    return
+                yield current.key, current.item
+                current = current.right
+
+    def items_reversed(self, lo: K | None = None, hi: K | None = None) -> Iterator[tuple[K, I]]:
+        """
+            Mirror image of items(), yielding the pairs in decreasing order of key.
+            :complexity: O(D + m), see items()
+        """
+        stack = []
+        current = self.root
+        while stack or current is not None:
+            if current is not None:
+                if hi is not None and current.key > hi:
+                    current = current.left
+                else:
+                    stack.append(current)
+                    current = current.right
+            else:
+                current = stack.pop()
+                if lo is not None and current.key < lo:
+                    return
+                yield current.key, current.item
+                current = current.left
+
+    def count_less(self, key: K, inclusive: bool = False) -> int:
+        """
+            Counts the keys smaller than key (or equal to it, if inclusive is True).
+
+            Doc: a single walk from the root. every time the walk goes right
+            the left subtree and the node itself are all smaller, so
+            left.subtree_size + 1 is added to the count.
+
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        count = 0
+        current = self.root
+        while current is not None:
+            if key < current.key:
+                current = current.left
+                continue
+
+            if current.left is not None:
+                left_side = current.left.subtree_size
+            else:
+                left_side = 0
+            if key > current.key:
+                count += left_side + 1
+                current = current.right
+            else:  # key == current.key
+                return count + left_side + (1 if inclusive else 0)
+        return count
+
+    def count_range(self, lo: K | None = None, hi: K | None = None) -> int:
+        """
+            Counts the keys k with lo <= k <= hi without visiting them.
+            A bound of None leaves that side of the range open.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        upper = len(self) if hi is None else self.count_less(hi, inclusive=True)
+        lower = 0 if lo is None else self.count_less(lo)
+        return max(0, upper - lower)
+
+    def rank(self, key: K) -> int:
+        """
+            Returns the number of keys smaller than key, which is the 0-based
+            position of key in sorted order when it is in the tree.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        return self.count_less(key)
+
+    def select(self, rank: int) -> TreeNode:
+        """
+            Returns the node at the given 0-based position in sorted order,
+            the inverse of rank().
+            :complexity: O(D) where D is the depth of the tree
+            :raises ValueError: if rank is not in range(len(self))
+        """
+        if not 0 <= rank < self.length:
+            raise ValueError('Rank out of range: {0}'.format(rank))
+        return self.kth_smallest(rank + 1, self.root)
+
+    def floor(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the largest key <= key, or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        return self.floor_aux(key, inclusive=True)
+
+    def ceiling(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the smallest key >= key, or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        return self.ceiling_aux(key, inclusive=True)
+
+    def predecessor(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the largest key < key, or None if there is none.
+            key does not need to be in the tree.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        return self.floor_aux(key, inclusive=False)
+
+    def successor(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the smallest key > key, or None if there is none.
+            Unlike get_successor this takes a key rather than a node and does
+            not need to restart from the root.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        return self.ceiling_aux(key, inclusive=False)
+
+    def floor_aux(self, key: K, inclusive: bool) -> TreeNode | None:
+        """
+            Single walk from the root remembering the last node whose key was
+            below key (or equal to it, if inclusive is True).
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if current.key < key:
+                best = current
+                current = current.right
+            elif inclusive and current.key == key:
+                return current
+            else:
+                current = current.left
+        return best
+
+    def ceiling_aux(self, key: K, inclusive: bool) -> TreeNode | None:
+        """
+            Mirror image of floor_aux, remembering the last node whose key was
+            above key (or equal to it, if inclusive is True).
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if current.key > key:
+                best = current
+                current = current.left
+            elif inclusive and current.key == key:
+                return current
+            else:
+                current = current.right
+        return best
+
     def draw(self, to=sys.stdout):
         """ Draw the tree in the terminal. """
 
-        # get the nodes of the graph to draw recursively
+        # get the nodes of the graph to draw in pre-order
         self.draw_aux(self.root, prefix='', final='', to=to)
 
     def draw_aux(self, current: TreeNode, prefix='', final='', to=sys.stdout) -> K:
-        """ Draw a node and then its children. """
+        """ Draw a node and then its children, using an explicit stack instead of recursion. """
 
-        if current is not None:
+        stack = [(current, prefix, final)]
+        while stack:
+            current, prefix, final = stack.pop()
             real_prefix = prefix[:-2] + final
-            print('{0}{1}'.format(real_prefix, str(current.key)), file=to)
+            if current is not None:
+                print('{0}{1}'.format(real_prefix, str(current.key)), file=to)
 
-            if current.left or current.right:
-                self.draw_aux(current.left,  prefix=prefix + '\u2551 ', final='\u255f\u2500', to=to)
-                self.draw_aux(current.right, prefix=prefix + '  ', final='\u2559\u2500', to=to)
-        else:
-            real_prefix = prefix[:-2] + final
-            print('{0}'.format(real_prefix), file=to)
+                if current.left or current.right:
+                    # pushed in reverse so that the left child is drawn first
+                    stack.append((current.right, prefix + '  ', '\u2559\u2500'))
+                    stack.append((current.left, prefix + '\u2551 ', '\u255f\u2500'))
+            else:
+                print('{0}'.format(real_prefix), file=to)
 
     def kth_smallest(self, k: int, current: TreeNode) -> TreeNode:
         """
         Finds the kth smallest value by key in the subtree rooted at current.
 
-        Doc: first the code willcheck if current is none . if its none then
-        it will raise the value error . after that , it will check if the current
-        node has a left child, it retrieves the size of the left subtree (left_side)
-        by accessing the subtree_size attribute of the left child node. Otherwise, it sets left_side to 0
-        after that it will compare k with the left side while adding 1
-        and once its equal then it will return current which will be the kth smallest
-        value . then if k is lesser equals to the left sides of the subtree then the
-        function is recursively called on the left child node . and lastly
-        if the  neither of the above conditions is met, it means the kth smallest value lies in the right subtree.
-        In this case, the kth_smallest function is recursively called on the right child node with k adjusted by subtracting
-        the size of the left subtree (left_side + 1).The function continues recursively until
-        the base case is reached and the kth smallest value is found which is the base case.
+        Doc: the code walks down from current in a loop. at each node it
+        retrieves the size of the left subtree (left_side) by accessing the
+        subtree_size attribute of the left child node, or 0 if there is no left child.
+        if k equals left_side + 1 then current is the kth smallest and is returned.
+        if k is lesser equals to left_side the walk continues in the left child,
+        otherwise it continues in the right child with k adjusted by subtracting
+        left_side + 1. if the walk falls off the tree then k was out of range
+        and a ValueError is raised.
 
         complexity:
 
-        best case : O(log n) where the n is the number of nodes processed at each level of the
-        recursion as its being halfed
+        best case : O(log n) where the n is the number of nodes as the subtree
+        being searched is halfed at each level
 
         worst case: O(n) where n is the total number of nodes in the BST
         as it occurs when the tree is highy unbalanced , resembling a linked list .
 
         """
-        if current is None:
-            raise ValueError("Invalid current node")
-
-
-        if current.left is not None:
-            left_side = current.left.subtree_size
-        else:
-            left_side = 0
+        while current is not None:
+            if current.left is not None:
+                left_side = current.left.subtree_size
+            else:
+                left_side = 0
 
-        if k == left_side + 1:
-            return current
-        elif k <= left_side:
-            return self.kth_smallest(k, current.left)
-        else:
-            return self.kth_smallest(k - (left_side + 1), current.right)
+            if k == left_side + 1:
+                return current
+            elif k <= left_side:
+                current = current.left
+            else:
+                k -= left_side + 1
+                current = current.right
+        raise ValueError("Invalid current node")
@@ -70,6 +70,13 @@ class MaxHeap(Generic[T]):
 
         self.the_array[k] = item
         
+    def peek_max(self) -> T:
+        """ Return the maximum element without removing it. """
+        if self.length == 0:
+            raise IndexError
+
+        return self.the_array[1]
+
     def get_max(self) -> T:
         """ Remove (and return) the maximum element from the heap. """
         if self.length == 0:
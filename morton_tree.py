@@ -0,0 +1,356 @@
+""" Linear octree over Morton codes.
+    Defines an alternative to the 3️⃣🇩🐝🌳 with the same mapping and box query interface.
+    Points are kept in flat arrays sorted by their Morton (Z-order) code, which
+    interleaves the bits of the three coordinates, so every octree cell is a
+    contiguous run of codes.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import pickle
+from array import array
+from bisect import bisect_left
+from heapq import heappop, heappush
+from math import ceil, floor
+from typing import BinaryIO, Generic, Iterable, Iterator, TypeVar
+
+from heap import MaxHeap
+from threedeebeetree import Point, distance_squared, point_in_box, region_distance_squared
+
+I = TypeVar('I')
+
+# bits per coordinate, so a code fits in 63 bits
+COORDINATE_BITS = 21
+# coordinates are stored shifted by BIAS, so the accepted range is [-BIAS, BIAS)
+BIAS = 1 << (COORDINATE_BITS - 1)
+COORDINATE_MAX = (1 << COORDINATE_BITS) - 1
+
+# cells holding at most this many points are filtered point by point instead of being split further
+SCAN_THRESHOLD = 32
+
+
+def spread_bits(value: int) -> int:
+    """ Spreads the 21 low bits of value out so that there are two zero bits between each of them. """
+    value &= 0x1fffff
+    value = (value | value << 32) & 0x1f00000000ffff
+    value = (value | value << 16) & 0x1f0000ff0000ff
+    value = (value | value << 8) & 0x100f00f00f00f00f
+    value = (value | value << 4) & 0x10c30c30c30c30c3
+    value = (value | value << 2) & 0x1249249249249249
+    return value
+
+
+def compact_bits(value: int) -> int:
+    """ Inverse of spread_bits, gathering every third bit of value. """
+    value &= 0x1249249249249249
+    value = (value ^ (value >> 2)) & 0x10c30c30c30c30c3
+    value = (value ^ (value >> 4)) & 0x100f00f00f00f00f
+    value = (value ^ (value >> 8)) & 0x1f0000ff0000ff
+    value = (value ^ (value >> 16)) & 0x1f00000000ffff
+    value = (value ^ (value >> 32)) & 0x1fffff
+    return value
+
+
+def encode(point: Point) -> int:
+    """
+    Returns the Morton code of point. The x coordinate goes in the lowest bit of
+    every group of three, matching the octant numbering of BeeNode.get_child_for_key.
+    :raises ValueError: if a coordinate is outside [-BIAS, BIAS)
+    """
+    x, y, z = point[0] + BIAS, point[1] + BIAS, point[2] + BIAS
+    if not (0 <= x <= COORDINATE_MAX and 0 <= y <= COORDINATE_MAX and 0 <= z <= COORDINATE_MAX):
+        raise ValueError('Point out of range: {0}'.format(point))
+    return spread_bits(x) | spread_bits(y) << 1 | spread_bits(z) << 2
+
+
+def decode(code: int) -> Point:
+    """ Returns the point whose Morton code is code. """
+    return (compact_bits(code) - BIAS, compact_bits(code >> 1) - BIAS, compact_bits(code >> 2) - BIAS)
+
+
+class MortonBeeTree(Generic[I]):
+    """
+        Linear octree with the mapping, box query and nearest neighbour
+        interface of ThreeDeeBeeTree.
+
+        codes is an array('Q') of the sorted Morton codes and items the list of
+        the matching items, so a point costs one machine word plus its item
+        reference. Lookups are binary searches. Updates shift the arrays, so this
+        suits large and mostly static point sets, built with from_points.
+        Coordinates must lie in [-BIAS, BIAS).
+    """
+
+    def __init__(self) -> None:
+        """
+            Initialises an empty tree
+            :complexity: O(1)
+        """
+        self.codes = array('Q')
+        self.items = []
+
+    @classmethod
+    def from_points(cls, points: Iterable[tuple[Point, I]]) -> MortonBeeTree[I]:
+        """
+            Builds the tree from an iterable of (point, item) pairs, sorting them once by code.
+            A point given more than once keeps its last item.
+            :complexity: O(n log n) where n is the number of points
+        """
+        by_code = {encode(point): item for point, item in points}
+        tree = cls()
+        tree.codes = array('Q', sorted(by_code))
+        tree.items = [by_code[code] for code in tree.codes]
+        return tree
+
+    def is_empty(self) -> bool:
+        """
+            Checks to see if the tree is empty
+        """
+        return len(self) == 0
+
+    def __len__(self) -> int:
+        """ Returns the number of points in the tree. """
+
+        return len(self.codes)
+
+    def index_of(self, key: Point) -> int:
+        """
+            Returns the position of key in the arrays, or -1 if it is not in the tree.
+            :complexity: O(log n)
+        """
+        try:
+            code = encode(key)
+        except ValueError:
+            return -1
+        index = bisect_left(self.codes, code)
+        if index < len(self.codes) and self.codes[index] == code:
+            return index
+        return -1
+
+    def __contains__(self, key: Point) -> bool:
+        """
+            Checks to see if the key is in the tree
+            :complexity: O(log n)
+        """
+        return self.index_of(key) >= 0
+
+    def __getitem__(self, key: Point) -> I:
+        """
+            Attempts to get an item in the tree, using a binary search on its code
+            :complexity: O(log n)
+        """
+        index = self.index_of(key)
+        if index < 0:
+            raise KeyError(f"Key {key} not in tree.")
+        return self.items[index]
+
+    def __setitem__(self, key: Point, item: I) -> None:
+        """
+            Inserts key, or replaces its item if it is already in the tree
+            :complexity: O(n) as the arrays are shifted to make room
+        """
+        code = encode(key)
+        index = bisect_left(self.codes, code)
+        if index < len(self.codes) and self.codes[index] == code:
+            self.items[index] = item
+        else:
+            self.codes.insert(index, code)
+            self.items.insert(index, item)
+
+    def __delitem__(self, key: Point) -> None:
+        """
+            Deletes key from the tree
+            :complexity: O(n) as the arrays are shifted to close the gap
+        """
+        index = self.index_of(key)
+        if index < 0:
+            raise ValueError('Deleting non-existent item')
+        del self.codes[index]
+        del self.items[index]
+
+    def __iter__(self) -> Iterator[Point]:
+        """ Iterates over the points in Z-order. """
+        for code in self.codes:
+            yield decode(code)
+
+    def iter_items(self) -> Iterator[tuple[Point, I]]:
+        """ Yields the (point, item) pairs in Z-order. """
+        for code, item in zip(self.codes, self.items):
+            yield decode(code), item
+
+    def box_ranges(self, lo: Point, hi: Point) -> Iterator[tuple[int, int, bool]]:
+        """
+            Decomposes the closed box [lo, hi] into runs of the arrays, yielding
+            (start, end, exact) for each run codes[start:end]. exact is True when
+            every point of the run is in the box and False when the run still
+            has to be filtered.
+
+            Doc: octree cells are visited from the whole space down with an explicit
+            stack; a cell of side 2 ** level whose smallest code is prefix covers
+            exactly the codes [prefix, prefix + 8 ** level). cells missing the box,
+            or holding no point, are dropped, cells inside the box are yielded
+            exact, and cells with at most SCAN_THRESHOLD points are yielded for
+            filtering; the others are split into their 8 children, in Z-order.
+
+            :complexity: O(C log n) where C is the number of cells visited, which
+            grows with the surface of the box rather than its volume.
+        """
+        x_lo, y_lo, z_lo = max(0, lo[0] + BIAS), max(0, lo[1] + BIAS), max(0, lo[2] + BIAS)
+        x_hi = min(COORDINATE_MAX, hi[0] + BIAS)
+        y_hi = min(COORDINATE_MAX, hi[1] + BIAS)
+        z_hi = min(COORDINATE_MAX, hi[2] + BIAS)
+        if x_lo > x_hi or y_lo > y_hi or z_lo > z_hi:
+            return
+
+        codes = self.codes
+        stack = [(0, COORDINATE_BITS, 0, len(codes))]
+        while stack:
+            prefix, level, start, end = stack.pop()
+            side = (1 << level) - 1
+            x, y, z = compact_bits(prefix), compact_bits(prefix >> 1), compact_bits(prefix >> 2)
+            if x > x_hi or y > y_hi or z > z_hi or x + side < x_lo or y + side < y_lo or z + side < z_lo:
+                continue
+            first = bisect_left(codes, prefix, start, end)
+            last = bisect_left(codes, prefix + (1 << (3 * level)), first, end)
+            if first == last:
+                continue
+            if (x_lo <= x and y_lo <= y and z_lo <= z
+                    and x + side <= x_hi and y + side <= y_hi and z + side <= z_hi):
+                yield first, last, True
+            elif last - first <= SCAN_THRESHOLD or level == 0:
+                yield first, last, False
+            else:
+                step = 1 << (3 * (level - 1))
+                for child in range(7, -1, -1):
+                    stack.append((prefix + child * step, level - 1, first, last))
+
+    def query_box(self, lo: Point, hi: Point) -> Iterator[tuple[Point, I]]:
+        """
+            Lazily yields the (key, item) pairs of every point p with lo <= p <= hi
+            on all three axes, in Z-order.
+            :complexity: see box_ranges, plus O(1) per point yielded or filtered
+        """
+        codes, items = self.codes, self.items
+        for start, end, exact in self.box_ranges(lo, hi):
+            for index in range(start, end):
+                point = decode(codes[index])
+                if exact or point_in_box(point, lo, hi):
+                    yield point, items[index]
+
+    def count_box(self, lo: Point, hi: Point) -> int:
+        """
+            Counts the points p with lo <= p <= hi on all three axes, runs that
+            lie inside the box counting by their length.
+            :complexity: see box_ranges
+        """
+        count = 0
+        codes = self.codes
+        for start, end, exact in self.box_ranges(lo, hi):
+            if exact:
+                count += end - start
+            else:
+                for index in range(start, end):
+                    if point_in_box(decode(codes[index]), lo, hi):
+                        count += 1
+        return count
+
+    def nearest(self, point: Point, k: int = 1) -> list[tuple[Point, I]]:
+        """
+            Returns the (key, item) pairs of the k points closest to point by
+            Euclidean distance, closest first. Ties are broken by the smaller key.
+
+            Doc: octree cells are popped from a min-heap ordered by their distance
+            to point, so they are visited nearest first. cells with at most
+            SCAN_THRESHOLD points are scanned into a MaxHeap of the best k
+            candidates, the others are split into their non-empty children, and
+            the walk stops as soon as the nearest remaining cell is farther than
+            the kth candidate.
+
+            :complexity: O(C log n + m log k) where C is the number of cells closer
+            than the kth nearest point and m the number of points scanned.
+        """
+        codes, items = self.codes, self.items
+        if len(codes) == 0 or k <= 0:
+            return []
+        best = MaxHeap(k)
+        cells = [(0, 0, COORDINATE_BITS, 0, len(codes))]
+        while cells:
+            cell_distance, prefix, level, start, end = heappop(cells)
+            if best.is_full() and cell_distance > best.peek_max()[0]:
+                break
+            if end - start <= SCAN_THRESHOLD or level == 0:
+                for index in range(start, end):
+                    key = decode(codes[index])
+                    candidate = (distance_squared(point, key), key, items[index])
+                    if not best.is_full():
+                        best.add(candidate)
+                    elif candidate[:2] < best.peek_max()[:2]:
+                        best.get_max()
+                        best.add(candidate)
+                continue
+            step = 1 << (3 * (level - 1))
+            side = (1 << (level - 1)) - 1
+            for child in range(8):
+                child_prefix = prefix + child * step
+                first = bisect_left(codes, child_prefix, start, end)
+                last = bisect_left(codes, child_prefix + step, first, end)
+                if first == last:
+                    continue
+                lo = decode(child_prefix)
+                hi = (lo[0] + side, lo[1] + side, lo[2] + side)
+                child_distance = region_distance_squared(point, lo, hi)
+                if not best.is_full() or child_distance <= best.peek_max()[0]:
+                    heappush(cells, (child_distance, child_prefix, level - 1, first, last))
+
+        found = []
+        while len(best) > 0:
+            _, key, item = best.get_max()
+            found.append((key, item))
+        found.reverse()
+        return found
+
+    def within_radius(self, point: Point, radius: float) -> Iterator[tuple[Point, I]]:
+        """
+            Lazily yields the (key, item) pairs of every point at Euclidean distance
+            at most radius from point, in Z-order.
+
+            Doc: the runs of box_ranges over the bounding box of the ball are
+            filtered by distance, exact runs included.
+
+            :complexity: see box_ranges, plus O(1) per point filtered
+        """
+        if radius < 0:
+            return
+        limit = radius * radius
+        lo = (ceil(point[0] - radius), ceil(point[1] - radius), ceil(point[2] - radius))
+        hi = (floor(point[0] + radius), floor(point[1] + radius), floor(point[2] + radius))
+        codes, items = self.codes, self.items
+        for start, end, _ in self.box_ranges(lo, hi):
+            for index in range(start, end):
+                key = decode(codes[index])
+                if distance_squared(point, key) <= limit:
+                    yield key, items[index]
+
+    def save(self, file: BinaryIO) -> None:
+        """
+            Writes the tree to a binary file: the number of points, then the codes
+            as one contiguous buffer of unsigned 64-bit integers, then the pickled items.
+            :complexity: O(n)
+        """
+        array('Q', [len(self.codes)]).tofile(file)
+        self.codes.tofile(file)
+        pickle.dump(self.items, file)
+
+    @classmethod
+    def load(cls, file: BinaryIO) -> MortonBeeTree[I]:
+        """
+            Reads a tree written by save.
+            :complexity: O(n)
+        """
+        header = array('Q')
+        header.fromfile(file, 1)
+        tree = cls()
+        tree.codes.fromfile(file, header[0])
+        tree.items = pickle.load(file)
+        return tree
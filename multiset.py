@@ -0,0 +1,293 @@
+""" Counted multiset ADT.
+    Defines an AVL tree holding every distinct key once, with the number of
+    copies of the key as its item. Every node also knows the total number of
+    copies in its subtree, so ranks and selections count copies rather than nodes.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from itertools import repeat
+from typing import TypeVar, Iterable, Iterator, Mapping
+from avl import AVLTree
+from node import CountedTreeNode
+
+# generic types
+K = TypeVar('K')
+
+
+class CountedAVLTree(AVLTree[K, int]):
+    """
+        Multiset of keys, in memory proportional to the number of distinct keys.
+
+        len() is the number of copies, while self.length stays the number of
+        nodes. Counts change through add, remove, __setitem__, __delitem__
+        and insert_sorted, which keep the totals of the ancestors of the changed
+        node up to date, and every order statistic (rank, select, kth_smallest,
+        elements) counts copies. split and join keep the totals as well.
+    """
+
+    def create_node(self, key: K, item: int) -> CountedTreeNode:
+        """
+            Creates a leaf holding item copies of key.
+            :complexity: O(1)
+        """
+        return CountedTreeNode(key, item=item, total=item)
+
+    def update_node(self, current: CountedTreeNode) -> None:
+        """
+            Recompute the height, subtree size and total of current from its children.
+            :complexity: O(1)
+        """
+        super().update_node(current)
+        total = current.item
+        if current.left is not None:
+            total += current.left.total
+        if current.right is not None:
+            total += current.right.total
+        current.total = total
+
+    def __len__(self) -> int:
+        """ Returns the number of copies of all the keys. """
+
+        return self.root.total if self.root is not None else 0
+
+    def count(self, key: K) -> int:
+        """
+            Returns the number of copies of key, 0 if it is not in the multiset.
+            :complexity: O(CompK * log N) where N is the number of distinct keys
+        """
+        try:
+            return self.get_tree_node_by_key(key).item
+        except KeyError:
+            return 0
+
+    def find_path(self, key: K) -> tuple[list[CountedTreeNode], CountedTreeNode | None]:
+        """
+            Returns the ancestors of the node holding key, from the root down,
+            and the node itself, or None with the path to where it would be.
+            :complexity: O(CompK * log N) where N is the number of distinct keys
+        """
+        path = []
+        current = self.root
+        while current is not None and key != current.key:
+            path.append(current)
+            if key < current.key:
+                current = current.left
+            else:  # key > current.key
+                current = current.right
+        return path, current
+
+    def add(self, key: K, copies: int = 1) -> None:
+        """
+            Adds copies more copies of key.
+
+            Doc: the totals of the ancestors are raised first. a key already in
+            the multiset only has its count raised, a new key is inserted with
+            insert_aux, whose rebalancing recomputes totals from the children
+            and so agrees with the ones raised beforehand.
+
+            :complexity: O(CompK * log N) where N is the number of distinct keys
+        """
+        path, current = self.find_path(key)
+        for ancestor in path:
+            ancestor.total += copies
+        if current is not None:
+            current.item += copies
+            current.total += copies
+        else:
+            self.root = self.insert_aux(self.root, key, copies)
+
+    def remove(self, key: K, copies: int = 1) -> None:
+        """
+            Removes copies copies of key, or all of them if there are fewer.
+
+            Doc: like add, the totals are lowered before the tree changes shape.
+            when the last copy goes the node is deleted with delete_aux; if it has
+            two children its successor moves into it, so the nodes between them
+            lose the successor's copies while the node itself only loses its own.
+
+            :complexity: O(CompK * log N) where N is the number of distinct keys
+            :raises ValueError: if key is not in the multiset
+        """
+        path, current = self.find_path(key)
+        if current is None:
+            raise ValueError('Deleting non-existent item')
+        if current.item > copies:
+            for ancestor in path:
+                ancestor.total -= copies
+            current.item -= copies
+            current.total -= copies
+            return
+
+        for ancestor in path:
+            ancestor.total -= current.item
+        if current.left is not None and current.right is not None:
+            succ = self.get_minimal(current.right)
+            node = current.right
+            while node is not succ:
+                node.total -= succ.item
+                node = node.left
+            current.total -= current.item
+        self.root = self.delete_aux(self.root, key)
+
+    def __setitem__(self, key: K, item: int) -> None:
+        """
+            Sets the number of copies of key to item, removing key if it is 0.
+            :complexity: O(CompK * log N) where N is the number of distinct keys
+        """
+        copies = self.count(key)
+        if item > copies:
+            self.add(key, item - copies)
+        elif item < copies:
+            self.remove(key, copies - item)
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Removes every copy of key.
+            :complexity: O(CompK * log N) where N is the number of distinct keys
+            :raises ValueError: if key is not in the multiset
+        """
+        path, current = self.find_path(key)
+        if current is None:
+            raise ValueError('Deleting non-existent item')
+        self.remove(key, current.item)
+
+    def update(self, items: Mapping[K, int] | Iterable[tuple[K, int]]) -> None:
+        """
+            Sets the count of every (key, count) pair, one at a time.
+            :complexity: O(CompK * m log N) where m is the number of pairs
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+        for key, item in items:
+            self[key] = item
+
+    def insert_sorted(self, pairs: list[tuple[K, int]]) -> None:
+        """
+            Inserts a batch of new (key, count) pairs, sorted by key, through add,
+            which keeps the totals of the ancestors up to date. The inherited
+            insert_aux only maintains subtree_size.
+            :complexity: O(CompK * m log N) where m is the size of the batch
+        """
+        for key, item in pairs:
+            self.add(key, item)
+
+    @classmethod
+    def join(cls, left: CountedAVLTree[K], right: CountedAVLTree[K]) -> CountedAVLTree[K]:
+        """
+            Joins two multisets where every key of left is smaller than every key of
+            right, see BinarySearchTree.join. Both multisets are left empty.
+
+            Doc: the smallest key of right is taken out with __delitem__, which keeps
+            the totals of its ancestors up to date where the inherited delete_aux
+            only maintains subtree_size, and becomes the node that join_aux puts
+            between the two trees, with all of its copies.
+
+            :complexity: O(CompK * (log N1 + log N2)) where N1 and N2 are the numbers of distinct keys
+            :raises ValueError: if the keys of the multisets overlap
+        """
+        tree = cls()
+        if right.root is None:
+            root = left.root
+        else:
+            minimal = right.get_minimal(right.root)
+            key, copies = minimal.key, minimal.item
+            if left.root is not None:
+                maximal = left.root
+                while maximal.right is not None:
+                    maximal = maximal.right
+                if not maximal.key < key:
+                    raise ValueError('Keys of the joined trees overlap')
+            del right[key]
+            root = tree.join_aux(left.root, tree.create_node(key, copies), right.root)
+
+        left.root, left.length = None, 0
+        right.root, right.length = None, 0
+        return tree.tree_from_root(root)
+
+    def count_less(self, key: K, inclusive: bool = False) -> int:
+        """
+            Counts the copies of keys smaller than key (or equal to it, if inclusive is True).
+            :complexity: O(CompK * log N) where N is the number of distinct keys
+        """
+        count = 0
+        current = self.root
+        while current is not None:
+            if key < current.key:
+                current = current.left
+                continue
+
+            left_side = current.left.total if current.left is not None else 0
+            if key > current.key:
+                count += left_side + current.item
+                current = current.right
+            else:  # key == current.key
+                return count + left_side + (current.item if inclusive else 0)
+        return count
+
+    def locate(self, rank: int) -> tuple[CountedTreeNode, int]:
+        """
+            Returns the node holding the copy at the given 0-based position in
+            sorted order, and the position of that copy among the copies of its key.
+            :complexity: O(log N) where N is the number of distinct keys
+            :raises ValueError: if rank is not in range(len(self))
+        """
+        if not 0 <= rank < len(self):
+            raise ValueError('Rank out of range: {0}'.format(rank))
+        current = self.root
+        while True:
+            left_side = current.left.total if current.left is not None else 0
+            if rank < left_side:
+                current = current.left
+            elif rank < left_side + current.item:
+                return current, rank - left_side
+            else:
+                rank -= left_side + current.item
+                current = current.right
+
+    def kth_smallest(self, k: int, current: CountedTreeNode) -> CountedTreeNode:
+        """
+            Returns the node holding the kth smallest copy (k counted from 1) in
+            the subtree rooted at current, counting copies like select.
+            :complexity: O(log N) where N is the number of distinct keys
+            :raises ValueError: if k is not in range(1, current.total + 1)
+        """
+        while current is not None:
+            left_side = current.left.total if current.left is not None else 0
+            if k <= left_side:
+                current = current.left
+            elif k <= left_side + current.item:
+                return current
+            else:
+                k -= left_side + current.item
+                current = current.right
+        raise ValueError("Invalid current node")
+
+    def select(self, rank: int) -> CountedTreeNode:
+        """
+            Returns the node holding the copy at the given 0-based position in sorted order.
+            :complexity: O(log N) where N is the number of distinct keys
+            :raises ValueError: if rank is not in range(len(self))
+        """
+        return self.locate(rank)[0]
+
+    def elements(self, start: int = 0, stop: int | None = None) -> Iterator[K]:
+        """
+            Lazily yields the copies at positions start up to, but excluding, stop
+            in sorted order, every key repeated as many times as it is counted.
+            :complexity: O(log N + k) where k is the number of copies yielded
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        node, skipped = self.locate(start)
+        remaining = stop - start
+        for key, item in self.items(node.key):
+            copies = min(item - skipped, remaining)
+            yield from repeat(key, copies)
+            remaining -= copies
+            if remaining == 0:
+                return
+            skipped = 0
@@ -11,9 +11,9 @@ __author__ = 'Maria Garcia de la Banda and Brendon Taylor. Modified by Alexey Ig
 __docformat__ = 'reStructuredText'
 
 
-@dataclass
+@dataclass(slots=True)
 class TreeNode(Generic[K, I]):
-    """ Node class represent BST nodes. """
+    """ Node class represent BST nodes. Slotted, so nodes carry no per-instance __dict__. """
 
     key: K
     item: I = None
@@ -33,3 +33,19 @@ class TreeNode(Generic[K, I]):
         key = str(self.key) if type(self.key) != str else "'{0}'".format(self.key)
         item = str(self.item) if type(self.item) != str else "'{0}'".format(self.item)
         return '({0}, {1}, [{2}])'.format(key, item, self.subtree_size)
+
+
+@dataclass(slots=True)
+class AVLTreeNode(TreeNode[K, I]):
+    """ Node class represent AVL tree nodes. """
+
+    # This value is maintained by avl.py, a leaf has height 1
+    height: int = 1
+
+
+@dataclass(slots=True)
+class CountedTreeNode(AVLTreeNode[K, I]):
+    """ Node class represent counted multiset nodes, whose item is the number of copies of the key. """
+
+    # This value is maintained by multiset.py, the sum of the items in the subtree
+    total: int = 1
@@ -0,0 +1,155 @@
+""" Persistent Binary Search Tree ADT.
+    Defines a Binary Search Tree that never modifies a node once it is reachable.
+    Every write copies the path from the root to the changed node and shares all
+    the other subtrees with the previous version, so older versions stay valid.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from dataclasses import replace
+from typing import TypeVar, Iterable, Mapping
+from bst import BinarySearchTree
+from node import TreeNode
+
+# generic types
+K = TypeVar('K')
+I = TypeVar('I')
+
+
+class PersistentBinarySearchTree(BinarySearchTree[K, I]):
+    """
+        Path-copying binary search tree with the same interface as BinarySearchTree.
+
+        snapshot() is O(1) and the nodes reachable from a snapshot are never
+        modified again, so readers on other threads can traverse it without
+        taking a lock while writers keep producing new versions.
+    """
+
+    def snapshot(self) -> PersistentBinarySearchTree[K, I]:
+        """
+            Returns the current version of the tree. Later writes to either
+            tree create new versions and are not seen by the other one.
+            :complexity: O(1)
+        """
+        version = type(self)()
+        version.root = self.root
+        version.length = self.length
+        return version
+
+    def with_item(self, key: K, item: I) -> PersistentBinarySearchTree[K, I]:
+        """
+            Returns a new version with key set to item, leaving this one unchanged.
+            :complexity: see insert_aux
+        """
+        version = self.snapshot()
+        version.root = version.insert_aux(version.root, key, item, replace_item=True)
+        return version
+
+    def without_key(self, key: K) -> PersistentBinarySearchTree[K, I]:
+        """
+            Returns a new version without key, leaving this one unchanged.
+            :complexity: see delete_aux
+        """
+        version = self.snapshot()
+        del version[key]
+        return version
+
+    def insert_aux(self, current: TreeNode, key: K, item: I, replace_item: bool = False) -> TreeNode:
+        """
+            Returns the root of a new version of the sub-tree rooted at current
+            with key inserted, copying the nodes on the path to it.
+            If replace_item is True an existing key gets its item replaced,
+            otherwise it raises a ValueError as in BinarySearchTree.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        path = []
+        node = current
+        while node is not None and key != node.key:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            else:  # key > node.key
+                node = node.right
+
+        if node is None:
+            new = self.create_node(key, item)
+            growth = 1
+            self.length += 1
+        elif replace_item:
+            new = replace(node, item=item)
+            growth = 0
+        else:  # key == node.key
+            raise ValueError('Inserting duplicate item')
+
+        for ancestor in reversed(path):
+            if key < ancestor.key:
+                new = replace(ancestor, left=new, subtree_size=ancestor.subtree_size + growth)
+            else:
+                new = replace(ancestor, right=new, subtree_size=ancestor.subtree_size + growth)
+        return new
+
+    def delete_aux(self, current: TreeNode, key: K) -> TreeNode:
+        """
+            Returns the root of a new version of the sub-tree rooted at current
+            without key. A node with two children is copied with the key and
+            item of its successor, and the path down to the successor is copied too.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        path = []
+        node = current
+        while node is not None and key != node.key:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            else:  # key > node.key
+                node = node.right
+        if node is None:  # key not found
+            raise ValueError('Deleting non-existent item')
+
+        if node.left is not None and node.right is not None:
+            # general case => find a successor
+            succ_path = []
+            succ = node.right
+            while succ.left is not None:
+                succ_path.append(succ)
+                succ = succ.left
+            right = succ.right
+            for ancestor in reversed(succ_path):
+                right = replace(ancestor, left=right, subtree_size=ancestor.subtree_size - 1)
+            new = replace(node, key=succ.key, item=succ.item, right=right,
+                          subtree_size=node.subtree_size - 1)
+        elif node.left is None:
+            new = node.right
+        else:
+            new = node.left
+
+        for ancestor in reversed(path):
+            if key < ancestor.key:
+                new = replace(ancestor, left=new, subtree_size=ancestor.subtree_size - 1)
+            else:
+                new = replace(ancestor, right=new, subtree_size=ancestor.subtree_size - 1)
+        self.length -= 1
+        return new
+
+    def join_aux(self, left: TreeNode | None, current: TreeNode, right: TreeNode | None) -> TreeNode:
+        """
+            Like BinarySearchTree.join_aux, but puts a copy of current at the root,
+            so split and join leave the nodes of older versions untouched.
+            :complexity: O(1)
+        """
+        current = replace(current, left=left, right=right)
+        self.update_node(current)
+        return current
+
+    def update(self, items: Mapping[K, I] | Iterable[tuple[K, I]]) -> None:
+        """
+            Sets every (key, item) pair like BinarySearchTree.update, one
+            path copy per pair, since the batched version updates nodes in place.
+            :complexity: O(CompK * m * D) where m is the number of pairs
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+        for key, item in items:
+            self.root = self.insert_aux(self.root, key, item, replace_item=True)
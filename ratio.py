@@ -1,87 +1,233 @@
 from __future__ import annotations
 
 import math
-from typing import Generic, TypeVar
-from math import ceil
-from bst import BinarySearchTree
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain, repeat
+from typing import Generic, Iterator, TypeVar
+from multiset import CountedAVLTree
+from sketch import KLLSketch
 
 T = TypeVar("T")
 I = TypeVar("I")
 
+# most distinct points changed since the last query that Percentiles.sorted_counts
+# patches into its cache, beyond which it rebuilds the cache from the multiset
+CACHE_MAX_CHANGES = 64
+
 class Percentiles(Generic[T]):
+    """
+    Multiset of points answering percentile ranges.
+
+    The points are kept in a CountedAVLTree, an order-statistic tree holding
+    every distinct point once with its number of copies, whose nodes know the
+    total number of copies in their subtree. Streams with many repeated
+    points therefore use memory proportional to the number of distinct points.
+
+    Given a sketch_size, the points are summarised by a KLLSketch of that size
+    instead, in memory that does not grow with the stream. Points can then no
+    longer be removed or listed, but boundaries answers approximately, within
+    error_bound, and sketches of several streams can be merged.
+
+    In exact mode ratio reads a cache of the distinct points and their prefix
+    counts, kept between calls and patched with the points added and removed
+    since, see sorted_counts.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, sketch_size: int | None = None, seed: int | None = None) -> None:
         """
-        empty array self.points
+        empty multiset self.points, or empty sketch self.sketch when sketch_size is given.
+        seed makes the sketch reproducible.
         """
-        self.points = []
-    
+        self.sketch = KLLSketch(sketch_size, seed) if sketch_size is not None else None
+        self.points = CountedAVLTree() if self.sketch is None else None
+        # the distinct points in increasing order as of the last query, None until then,
+        # their numbers of copies, the running totals of those, and the net change
+        # in copies of every point added or removed since
+        self.keys = None
+        self.counts = None
+        self.cumulative = None
+        self.pending = {}
+        self.cache_hits = 0
+        self.cache_patches = 0
+        self.cache_rebuilds = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of points, counting repeated points every time. """
+        if self.sketch is not None:
+            return len(self.sketch)
+        return len(self.points)
+
     def add_point(self, item: T):
         """
-        append the item into the self.points list
+        add one copy of the item to the multiset self.points, or to the sketch
+
+        time complexity: O(log d) where d is the number of distinct points,
+        O(1) amortised for a sketch
         """
-        self.points.append(item)
+        if self.sketch is not None:
+            self.sketch.add(item)
+        else:
+            self.points.add(item)
+            if self.keys is not None:
+                self.pending[item] = self.pending.get(item, 0) + 1
 
-    
     def remove_point(self, item: T):
         """
-        remove the item in the list self.points
+        remove one copy of the item from the multiset self.points, if it is there
+
+        time complexity: O(log d) where d is the number of distinct points
+        :raises ValueError: for a sketch, which cannot forget points
         """
-        if item in self.points:
+        if self.sketch is not None:
+            raise ValueError('Points cannot be removed from a sketch')
+        try:
             self.points.remove(item)
+        except ValueError:
+            return
+        if self.keys is not None:
+            self.pending[item] = self.pending.get(item, 0) - 1
 
-    def ratio(self, x, y):
+    def ratio_ranks(self, x, y) -> tuple[int, int]:
         """
-        doc: having the ratio of the list to be extracted . by that we use the n as the len of table
-        then the x and y count is used with function max to picked out the max value of 0,x*n percentage
-        and max value of y*n percentage . then it will go through the quicksort made base on the units
-        we have learned and then it will grab the elements in between of the index given .
-
+        Returns the range of ranks [start, stop) of the points ratio(x, y) returns:
+        x percent of the points, rounded up, are left out at the bottom and
+        y percent, rounded up and at least one, at the top.
         """
-        n = len(self.points)
+        n = len(self)
         x_count = max(0, math.ceil(x * n / 100))
         y_count = max(1, math.ceil(y * n / 100))
-        sorted_points = self.quicksort(self.points)
-        return sorted_points[x_count:-y_count]
-
-
-
-    #since sort and sorted are not allowed i made a simple quicksort
-    # however base on this ed discussion https://edstem.org/au/courses/10179/discussion/1376885
-    # it seems that i can make my own sort and then implement it so i decided to use quickort
-    def quicksort(self,arr:[]):
+        return x_count, n - y_count
 
+    def ratio(self, x, y) -> Iterator[T]:
         """
-        This is a simple quicksort build to sort the elements in the list using a pivot
-
-        Doc: this quicksort have a base cae of len(arr) leeser equlas to 1
-        it will return the list array . it will first get the pivot of the middle
-        part of the list and then it takes the left and then the right side of the
-        list left for elements smaller than the pivot and right for elements larger
-         than the pivot and the middle it takes the pivot . then it will perform the
-         recursive calls with the middle array to form the sorted array .
-
-         time complexity
-
-         best case: O(n log n) where n is the number of the elements in the
-         array and the log n is cause by the list splitting in half. as the steps reduced
-         the problem size by half
+        doc: having the ratio of the list to be extracted . by that we use the n as the len of table
+        then the x and y count is used with function max to picked out the max value of 0,x*n percentage
+        and max value of y*n percentage . the points ranked from x_count up to n - y_count, counting
+        every copy, are then lazily yielded in increasing order by copies, from the cache of
+        sorted_counts, which finds the distinct points holding them by bisecting the prefix counts.
 
-         worst case: O(n**2) where the partioning is unbalanced as the pivot element
-         consistently selects the largest or the smallest element in the array .
+        time complexity: O(log d + k) where d is the number of distinct points and k the number
+        yielded, plus the cost of bringing the cache up to date after updates, see sorted_counts
+        :raises ValueError: for a sketch, which does not keep the points, see boundaries
+        """
+        if self.sketch is not None:
+            raise ValueError('A sketch does not keep the points, use boundaries')
+        start, stop = self.ratio_ranks(x, y)
+        self.sorted_counts()
+        return self.copies(start, stop)
 
+    def copies(self, start: int, stop: int) -> Iterator[T]:
+        """
+        Lazily yields the copies ranked start up to, but excluding, stop of the
+        points in the cache of sorted_counts, which must be up to date.
 
+        Doc: the first and last distinct points in the range are found by
+        bisecting the prefix counts, their counts are trimmed to the copies in
+        the range, and the copies are chained from a repeat per point, so the
+        iteration runs in C rather than in a Python loop.
 
+        time complexity: O(log d + m) where m <= k is the number of distinct points in the range
+        """
+        if start >= stop:
+            return iter(())
+        cumulative = self.cumulative
+        first = bisect_right(cumulative, start)
+        last = bisect_left(cumulative, stop)
+        counts = self.counts[first:last + 1]
+        counts[0] = cumulative[first] - start
+        counts[-1] -= cumulative[last] - stop
+        return chain.from_iterable(map(repeat, self.keys[first:last + 1], counts))
+
+    def sorted_counts(self) -> tuple[list[T], array]:
         """
-        if len(arr) <= 1:
-            return arr
+        Returns the distinct points in increasing order and the prefix counts of
+        their copies, cumulative[i] being the number of copies of keys[0..i],
+        kept between calls so that repeated ratio calls only bisect and read them.
+
+        Doc: the first call builds the cache from the items of the multiset.
+        afterwards add_point and remove_point only record the net change in
+        copies of their point, and the next call patches the cache with them:
+        each point is found by bisection, its count changed, and a point that
+        appears or disappears is inserted into or deleted from the lists, then
+        the prefix counts are recomputed in one pass of accumulate. after more
+        than CACHE_MAX_CHANGES distinct points have changed the cache is rebuilt
+        from the multiset instead. cache_hits, cache_patches and cache_rebuilds
+        count the calls that found the cache up to date, patched it and rebuilt it.
+        the cache holds one entry per distinct point, like the multiset.
+
+        time complexity: O(1) when up to date, O(c log d + c d) to patch it with c
+        changed points, where d is the number of distinct points, the c d being the
+        list insertions and deletions done by memmove, and O(d) to rebuild it
+        """
+        if self.keys is None or len(self.pending) > CACHE_MAX_CHANGES:
+            self.keys = []
+            self.counts = array('q')
+            for item, copies in self.points.items():
+                self.keys.append(item)
+                self.counts.append(copies)
+            self.cumulative = array('q', accumulate(self.counts))
+            self.cache_rebuilds += 1
+        elif self.pending:
+            keys, counts = self.keys, self.counts
+            for item, change in self.pending.items():
+                index = bisect_left(keys, item)
+                if index < len(keys) and keys[index] == item:
+                    counts[index] += change
+                    if counts[index] == 0:
+                        del keys[index]
+                        del counts[index]
+                elif change:
+                    # a point that was not there can only have gained copies
+                    keys.insert(index, item)
+                    counts.insert(index, change)
+            self.cumulative = array('q', accumulate(counts))
+            self.cache_patches += 1
+        else:
+            self.cache_hits += 1
+        self.pending = {}
+        return self.keys, self.cumulative
+
+    def boundaries(self, x, y) -> tuple[T, T] | None:
+        """
+        Returns the smallest and largest point ratio(x, y) would return, or None
+        if it would return nothing. For a sketch they are estimates, whose
+        ranks are off by at most error_bound() of the points with high probability.
 
-        pivot = arr[len(arr) // 2]
-        left = [x for x in arr if x < pivot]
-        middle = [x for x in arr if x == pivot]
-        right = [x for x in arr if x > pivot]
+        time complexity: O(log d), O(k log k) for a sketch of size k
+        """
+        start, stop = self.ratio_ranks(x, y)
+        if start >= stop:
+            return None
+        if self.sketch is not None:
+            return self.sketch.select(start), self.sketch.select(stop - 1)
+        return self.points.select(start).key, self.points.select(stop - 1).key
+
+    def merge(self, other: Percentiles[T]) -> None:
+        """
+        Adds the points of other, for example the same percentiles kept by
+        another worker, which must also be a sketch if this is one.
 
-        return self.quicksort(left) + middle + self.quicksort(right)
+        time complexity: O(d log d) for d distinct points in other, O(k log k) for sketches
+        :raises ValueError: if only one of the two is a sketch
+        """
+        if (self.sketch is None) != (other.sketch is None):
+            raise ValueError('Cannot merge exact percentiles with a sketch')
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        else:
+            for item, copies in other.points.items():
+                self.points.add(item, copies)
+            self.keys = None
+
+    def error_bound(self, delta: float = 0.01) -> float:
+        """
+        Returns the fraction of the points by which the ranks of boundaries may
+        be off with probability 1 - delta, 0 unless this is a sketch.
+        """
+        if self.sketch is None:
+            return 0.0
+        return self.sketch.error_bound(delta)
 
 if __name__ == "__main__":
     points = list(range(50))
@@ -91,4 +237,4 @@ if __name__ == "__main__":
     for point in points:
         p.add_point(point)
     # Numbers from 8 to 16.
-    print(p.ratio(15, 66))
+    print(list(p.ratio(15, 66)))
@@ -0,0 +1,172 @@
+""" KLL quantile sketch.
+    Defines a summary of a stream of comparable items that answers rank and
+    quantile queries approximately in memory that does not grow with the stream.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import math
+import random
+from bisect import bisect_left
+from typing import Generic, Iterable, TypeVar
+
+T = TypeVar('T')
+
+# ratio between the capacities of consecutive levels, as in the KLL paper
+CAPACITY_RATIO = 2 / 3
+
+
+class KLLSketch(Generic[T]):
+    """
+        Karnin-Lang-Liberty sketch.
+
+        compactors[h] holds items standing for 2 ** h items of the stream each.
+        When the sketch holds too many items, the lowest full level is sorted
+        and every other item, starting at a random offset, moves one level up.
+        The top level can hold about k items and each level below it 2/3 as
+        many, so the sketch keeps O(k) items in total.
+
+        A compaction at level h moves the estimated rank of any item by 2 ** h
+        or not at all, up or down with equal chance, so the rank error is a sum
+        of independent zero-mean steps and error_variance, the sum of the
+        squared weights of all compactions, bounds it through Hoeffding's inequality.
+    """
+
+    def __init__(self, k: int = 200, seed: int | None = None) -> None:
+        """
+            Initialises an empty sketch keeping about 3k items.
+            seed makes the compaction offsets reproducible.
+            :complexity: O(1)
+            :raises ValueError: if k is less than 2
+        """
+        if k < 2:
+            raise ValueError('Sketch size must be at least 2: {0}'.format(k))
+        self.k = k
+        self.random = random.Random(seed)
+        self.compactors = [[]]
+        self.count = 0
+        self.size = 0
+        self.max_size = self.capacity(0)
+        self.error_variance = 0
+
+    def capacity(self, level: int) -> int:
+        """ Number of items level can hold before it is compacted. """
+        height = len(self.compactors) - level - 1
+        return max(2, math.ceil(self.k * CAPACITY_RATIO ** height))
+
+    def __len__(self) -> int:
+        """ Returns the number of items added to the sketch. """
+        return self.count
+
+    def add(self, item: T) -> None:
+        """
+            Adds item to the sketch.
+            :complexity: O(1) amortised, plus O(k log k) for the occasional compaction
+        """
+        self.compactors[0].append(item)
+        self.count += 1
+        self.size += 1
+        if self.size >= self.max_size:
+            self.compress()
+
+    def update(self, items: Iterable[T]) -> None:
+        """ Adds every item of items to the sketch. """
+        for item in items:
+            self.add(item)
+
+    def merge(self, other: KLLSketch[T]) -> None:
+        """
+            Adds the items summarised by other to this sketch, level by level,
+            so sketches of parts of a stream built by separate workers combine
+            into a sketch of the whole stream. other is left unchanged.
+            :complexity: O(k log k)
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.grow()
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self.count += other.count
+        self.error_variance += other.error_variance
+        self.size = sum(map(len, self.compactors))
+        while self.size >= self.max_size:
+            self.compress()
+
+    def grow(self) -> None:
+        """ Adds a level on top, which raises the capacity of all the others. """
+        self.compactors.append([])
+        self.max_size = sum(self.capacity(level) for level in range(len(self.compactors)))
+
+    def compress(self) -> None:
+        """
+            Compacts the lowest level that is over its capacity, adding a level on top if needed.
+            :complexity: O(k log k)
+        """
+        for level in range(len(self.compactors)):
+            compactor = self.compactors[level]
+            if len(compactor) >= self.capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.grow()
+                compactor.sort()
+                offset = self.random.randrange(2)
+                # an odd item out stays at this level
+                kept = compactor.pop() if len(compactor) % 2 else None
+                self.compactors[level + 1].extend(compactor[offset::2])
+                compactor.clear()
+                if kept is not None:
+                    compactor.append(kept)
+                weight = 1 << level
+                self.error_variance += weight * weight
+                self.size = sum(map(len, self.compactors))
+                if self.size < self.max_size:
+                    return
+
+    def weighted_items(self) -> tuple[list[T], list[int]]:
+        """
+            Returns the items held by the sketch in increasing order, and the
+            estimated number of stream items up to and including each of them.
+            :complexity: O(k log k)
+        """
+        pairs = sorted((item, 1 << level) for level, compactor in enumerate(self.compactors)
+                       for item in compactor)
+        items = [item for item, _ in pairs]
+        cumulative = []
+        total = 0
+        for _, weight in pairs:
+            total += weight
+            cumulative.append(total)
+        return items, cumulative
+
+    def rank(self, item: T) -> int:
+        """
+            Estimates the number of items added that are smaller than item.
+            :complexity: O(k)
+        """
+        return sum(sum(1 for held in compactor if held < item) << level
+                   for level, compactor in enumerate(self.compactors))
+
+    def select(self, rank: int) -> T:
+        """
+            Returns an item whose estimated 0-based position in sorted order is rank.
+            :complexity: O(k log k)
+            :raises ValueError: if rank is not in range(len(self))
+        """
+        if not 0 <= rank < self.count:
+            raise ValueError('Rank out of range: {0}'.format(rank))
+        items, cumulative = self.weighted_items()
+        return items[min(bisect_left(cumulative, rank + 1), len(items) - 1)]
+
+    def quantile(self, q: float) -> T:
+        """ Returns an item estimated to have a fraction q of the items below it. """
+        return self.select(min(self.count - 1, max(0, int(q * self.count))))
+
+    def error_bound(self, delta: float = 0.01) -> float:
+        """
+            Returns a bound on the error of rank and select, as a fraction of the
+            number of items added, that holds for any one query with probability
+            at least 1 - delta: sqrt(2 * error_variance * ln(2 / delta)) / n.
+        """
+        if not self.count:
+            return 0.0
+        return math.sqrt(2 * self.error_variance * math.log(2 / delta)) / self.count
@@ -0,0 +1,156 @@
+""" Sorting and selection utilities for lists, written without sort/sorted. """
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from typing import TypeVar
+from heap import MaxHeap
+
+T = TypeVar('T')
+
+# ranges of at most this many elements are finished by insertion sort
+INSERTION_CUTOFF = 16
+
+
+def median_of_three(array: list[T], lo: int, hi: int) -> int:
+    """
+    Returns the index of the median of array[lo], array[mid] and array[hi].
+    :complexity: O(1) comparisons
+    """
+    mid = (lo + hi) // 2
+    a, b, c = array[lo], array[mid], array[hi]
+    if a < b:
+        if b < c:
+            return mid
+        return hi if a < c else lo
+    if a < c:
+        return lo
+    return hi if b < c else mid
+
+
+def quickselect(array: list[T], k: int) -> T:
+    """
+    Returns the kth smallest element of array (k counted from 0), rearranging
+    array in place so that array[k] holds it, everything before it is <= and
+    everything after it is >=.
+
+    Doc: Hoare partitioning around a median-of-three pivot, continuing only into
+    the side that holds position k. the pivot choice is deterministic, so the
+    same input is always rearranged the same way.
+
+    :complexity: O(n) on average, O(n^2) in the worst case, where n is len(array)
+    :raises IndexError: if k is not in range(len(array))
+    """
+    if not 0 <= k < len(array):
+        raise IndexError('Selection index out of range: {0}'.format(k))
+    lo, hi = 0, len(array) - 1
+    while lo < hi:
+        pivot = array[median_of_three(array, lo, hi)]
+        i, j = lo, hi
+        while i <= j:
+            while array[i] < pivot:
+                i += 1
+            while pivot < array[j]:
+                j -= 1
+            if i <= j:
+                array[i], array[j] = array[j], array[i]
+                i += 1
+                j -= 1
+        # now array[lo..j] <= pivot <= array[i..hi] and everything in between equals pivot
+        if k <= j:
+            hi = j
+        elif k >= i:
+            lo = i
+        else:
+            break
+    return array[k]
+
+
+def insertion_sort(array: list[T], lo: int, hi: int) -> None:
+    """
+    Sorts array[lo..hi] in place.
+    :complexity: O(n^2) comparisons, O(n) on sorted input, where n is hi - lo + 1
+    """
+    for i in range(lo + 1, hi + 1):
+        item = array[i]
+        j = i - 1
+        while j >= lo and item < array[j]:
+            array[j + 1] = array[j]
+            j -= 1
+        array[j + 1] = item
+
+
+def heapsort(array: list[T], lo: int, hi: int) -> None:
+    """
+    Sorts array[lo..hi] in place through a MaxHeap, taking the largest element
+    out first and writing it from hi downwards.
+    :complexity: O(n log n) comparisons, where n is hi - lo + 1
+    """
+    heap = MaxHeap(hi - lo + 1)
+    for i in range(lo, hi + 1):
+        heap.add(array[i])
+    for i in range(hi, lo - 1, -1):
+        array[i] = heap.get_max()
+
+
+def introsort(array: list[T]) -> None:
+    """
+    Sorts array in place.
+
+    Doc: quicksort with the Hoare partitioning and median-of-three pivot of
+    quickselect, so runs of equal elements are split evenly rather than
+    piled on one side, and sorted input is split in the middle. as in pdqsort,
+    every element before a range is at most every element in it, so a pivot
+    equal to the element just before the range is the smallest value in it:
+    the elements equal to it are moved to the front in one pass and left out,
+    which sorts input with k distinct values in O(n k). ranges are
+    kept on an explicit stack, the larger side of each partition pushed and
+    the smaller one sorted next, so the stack holds O(log n) ranges. ranges of
+    at most INSERTION_CUTOFF elements are left to insertion sort, and a range
+    still unsorted after 2 log2 n levels of partitioning is heapsorted, which
+    bounds the worst case. not stable.
+
+    :complexity: O(n log n) comparisons in the worst case, O(log n) extra space
+        besides the heap of a heapsorted range, where n is len(array)
+    """
+    if len(array) < 2:
+        return
+    stack = [(0, len(array) - 1, 2 * len(array).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo + 1 > INSERTION_CUTOFF:
+            if depth == 0:
+                heapsort(array, lo, hi)
+                break
+            pivot = array[median_of_three(array, lo, hi)]
+            if lo > 0 and not array[lo - 1] < pivot:
+                # the pivot equals the element before the range, which is at most
+                # every element of it, so the elements equal to the pivot go first and are done
+                i = lo
+                for j in range(lo, hi + 1):
+                    if not pivot < array[j]:
+                        array[i], array[j] = array[j], array[i]
+                        i += 1
+                lo = i
+                continue
+            depth -= 1
+            i, j = lo, hi
+            while i <= j:
+                while array[i] < pivot:
+                    i += 1
+                while pivot < array[j]:
+                    j -= 1
+                if i <= j:
+                    array[i], array[j] = array[j], array[i]
+                    i += 1
+                    j -= 1
+            # now array[lo..j] <= pivot <= array[i..hi] and everything in between equals pivot
+            if j - lo < hi - i:
+                stack.append((i, hi, depth))
+                hi = j
+            else:
+                stack.append((lo, j, depth))
+                lo = i
+        else:
+            insertion_sort(array, lo, hi)
@@ -0,0 +1,64 @@
+import pickle
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from array_bst import ArrayBinarySearchTree, NIL
+
+
+class ArrayBSTTest(unittest.TestCase):
+
+    @timeout()
+    @number("7.1")
+    def test_mapping(self):
+        BST = ArrayBinarySearchTree()
+        for key, item in [(95, 1), (73, 2), (99, 3), (50, 4), (85, 5), (80, 6)]:
+            BST[key] = item
+        self.assertEqual(len(BST), 6)
+        self.assertEqual(BST[85], 5)
+        self.assertIn(80, BST)
+        self.assertNotIn(81, BST)
+        with self.assertRaises(KeyError):
+            _ = BST[81]
+        with self.assertRaises(ValueError):
+            BST[73] = 0
+        self.assertEqual(BST.subtree_size[BST.root], 6)
+        self.assertEqual(BST.keys_[BST.kth_smallest(3)], 80)
+
+        del BST[73]
+        del BST[95]
+        self.assertEqual(list(BST.items()), [(50, 4), (80, 6), (85, 5), (99, 3)])
+        self.assertEqual(BST.subtree_size[BST.root], 4)
+        with self.assertRaises(ValueError):
+            del BST[73]
+
+        # freed slots are reused before the arrays grow
+        BST[60] = 7
+        BST[70] = 8
+        self.assertEqual(len(BST.items_), 6)
+        self.assertEqual(list(BST), [50, 60, 70, 80, 85, 99])
+
+    @timeout()
+    @number("7.2")
+    def test_random_against_dict(self):
+        random.seed(1008)
+        BST = ArrayBinarySearchTree('q')
+        expected = {}
+        for _ in range(3000):
+            key = random.randrange(500)
+            if key in expected:
+                del BST[key]
+                del expected[key]
+            else:
+                BST[key] = str(key)
+                expected[key] = str(key)
+        self.assertEqual(list(BST.items()), sorted(expected.items()))
+        for k, key in enumerate(sorted(expected), start=1):
+            self.assertEqual(BST.keys_[BST.kth_smallest(k)], key)
+
+        copy = pickle.loads(pickle.dumps(BST))
+        self.assertEqual(list(copy.items()), sorted(expected.items()))
+        self.assertEqual(copy.keys_.typecode, 'q')
+        if BST.root != NIL:
+            self.assertEqual(copy.subtree_size[copy.root], len(expected))
@@ -0,0 +1,144 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from avl import AVLTree
+
+
+def check_node(test, node):
+    if node is None:
+        return 0, 0
+    left_height, left_size = check_node(test, node.left)
+    right_height, right_size = check_node(test, node.right)
+    test.assertLessEqual(abs(left_height - right_height), 1)
+    test.assertEqual(node.height, 1 + max(left_height, right_height))
+    test.assertEqual(node.subtree_size, 1 + left_size + right_size)
+    return node.height, node.subtree_size
+
+
+class AVLTest(unittest.TestCase):
+
+    @timeout()
+    @number("6.1")
+    def test_sorted_insert(self):
+        tree = AVLTree()
+        for i in range(2000):
+            tree[i] = str(i)
+        self.assertEqual(len(tree), 2000)
+        self.assertLessEqual(tree.root.height, 16)
+        check_node(self, tree.root)
+        self.assertEqual(tree[1234], "1234")
+        self.assertEqual(tree.kth_smallest(1500, tree.root).key, 1499)
+
+    @timeout()
+    @number("6.2")
+    def test_delete(self):
+        random.seed(20230523)
+        keys = list(range(500))
+        random.shuffle(keys)
+        tree = AVLTree()
+        for key in keys:
+            tree[key] = key
+        for key in keys[:300]:
+            del tree[key]
+            check_node(self, tree.root)
+        self.assertEqual(len(tree), 200)
+        remaining = sorted(keys[300:])
+        for k, key in enumerate(remaining, start=1):
+            self.assertEqual(tree.kth_smallest(k, tree.root).key, key)
+        self.assertNotIn(keys[0], tree)
+        with self.assertRaises(ValueError):
+            tree[remaining[0]] = 0
+        with self.assertRaises(ValueError):
+            del tree[keys[0]]
+
+    @timeout()
+    @number("6.3")
+    def test_from_items(self):
+        tree = AVLTree.from_items((i, i) for i in range(1023, -1, -1))
+        self.assertEqual(len(tree), 1024)
+        check_node(self, tree.root)
+        self.assertEqual(tree.root.height, 11)
+        for i in range(1024, 1100):
+            tree[i] = i
+        check_node(self, tree.root)
+        self.assertEqual(tree.kth_smallest(1100, tree.root).key, 1099)
+
+    @timeout()
+    @number("6.4")
+    def test_update(self):
+        tree = AVLTree()
+        tree.update((i, i) for i in range(0, 1000, 2))
+        tree.update({i: -i for i in range(0, 1000, 5)})
+        check_node(self, tree.root)
+        self.assertEqual(len(tree), 600)
+        self.assertEqual(tree.get_many([10, 12, 15]), [-10, 12, -15])
+
+    @timeout()
+    @number("6.5")
+    def test_split_join(self):
+        tree = AVLTree.from_items((i, i) for i in range(1000))
+        left, right = tree.split(300)
+        check_node(self, left.root)
+        check_node(self, right.root)
+        self.assertEqual(list(left), list(range(300)))
+        self.assertEqual(len(right), 700)
+
+        small = AVLTree.from_items((i, i) for i in range(2000, 2005))
+        joined = AVLTree.join(right, small)
+        check_node(self, joined.root)
+        joined = AVLTree.join(left, joined)
+        check_node(self, joined.root)
+        self.assertEqual(len(joined), 1005)
+        self.assertEqual(joined.kth_smallest(1001, joined.root).key, 2000)
+
+    @timeout()
+    @number("6.6")
+    def test_random_updates(self):
+        random.seed(1008)
+        tree = AVLTree()
+        expected = {}
+        for step in range(3000):
+            key = random.randrange(800)
+            if key in expected:
+                del tree[key]
+                del expected[key]
+            else:
+                tree[key] = step
+                expected[key] = step
+            if step < 300 or step % 100 == 0:
+                check_node(self, tree.root)
+        check_node(self, tree.root)
+        self.assertEqual(len(tree), len(expected))
+        self.assertEqual(list(tree), sorted(expected))
+        for k, key in enumerate(sorted(expected), start=1):
+            self.assertEqual(tree.kth_smallest(k, tree.root).key, key)
+            self.assertEqual(tree[key], expected[key])
+
+    @timeout()
+    @number("6.7")
+    def test_early_stop(self):
+        class CountingTree(AVLTree):
+            rebalanced = 0
+
+            def rebalance(self, current):
+                self.rebalanced += 1
+                return super().rebalance(current)
+
+        random.seed(1008)
+        keys = random.sample(range(10 ** 6), 5000)
+        tree = CountingTree()
+        for key in keys:
+            tree[key] = key
+        check_node(self, tree.root)
+        # a rebalanced sub-tree usually keeps its height, so the walk back up stops
+        # well before the root, which is about 15 levels up
+        self.assertLess(tree.rebalanced / len(keys), 4)
+
+        tree.rebalanced = 0
+        for key in keys[:2500]:
+            del tree[key]
+        check_node(self, tree.root)
+        self.assertLess(tree.rebalanced / 2500, 4)
+        self.assertEqual(list(tree), sorted(keys[2500:]))
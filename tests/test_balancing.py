@@ -1,93 +1,12 @@
+import os
 import random
+import tempfile
 import unittest
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
-from threedeebeetree import ThreeDeeBeeTree, BeeNode
-from balancing import make_ordering
-
-
-def get_size(node):
-    if node is None:
-        return 0
-    return node.subtree_size
-
-
-# Testing function to calculate the worst ratio on your 3️⃣🇩🐝🌳
-def collect_worst_ratio(node: BeeNode):
-    default = (1, 0, "")
-    if node is None:
-        return default
-    root_level = node.key
-    neg_x_pos_y_pos_z = node.get_child_for_key((root_level[0] - 1, root_level[1] + 1, root_level[2] + 1))
-    neg_x_pos_y_neg_z = node.get_child_for_key((root_level[0] - 1, root_level[1] + 1, root_level[2] - 1))
-    neg_x_neg_y_pos_z = node.get_child_for_key((root_level[0] - 1, root_level[1] - 1, root_level[2] + 1))
-    neg_x_neg_y_neg_z = node.get_child_for_key((root_level[0] - 1, root_level[1] - 1, root_level[2] - 1))
-    pos_x_pos_y_pos_z = node.get_child_for_key((root_level[0] + 1, root_level[1] + 1, root_level[2] + 1))
-    pos_x_pos_y_neg_z = node.get_child_for_key((root_level[0] + 1, root_level[1] + 1, root_level[2] - 1))
-    pos_x_neg_y_pos_z = node.get_child_for_key((root_level[0] + 1, root_level[1] - 1, root_level[2] + 1))
-    pos_x_neg_y_neg_z = node.get_child_for_key((root_level[0] + 1, root_level[1] - 1, root_level[2] - 1))
-    pos_x = sum(get_size(n) for n in [
-        pos_x_neg_y_neg_z,
-        pos_x_neg_y_pos_z,
-        pos_x_pos_y_neg_z,
-        pos_x_pos_y_pos_z,
-    ])
-    neg_x = sum(get_size(n) for n in [
-        neg_x_neg_y_neg_z,
-        neg_x_neg_y_pos_z,
-        neg_x_pos_y_neg_z,
-        neg_x_pos_y_pos_z,
-    ])
-    pos_y = sum(get_size(n) for n in [
-        neg_x_pos_y_neg_z,
-        neg_x_pos_y_pos_z,
-        pos_x_pos_y_neg_z,
-        pos_x_pos_y_pos_z,
-    ])
-    neg_y = sum(get_size(n) for n in [
-        neg_x_neg_y_neg_z,
-        neg_x_neg_y_pos_z,
-        pos_x_neg_y_neg_z,
-        pos_x_neg_y_pos_z,
-    ])
-    pos_z = sum(get_size(n) for n in [
-        neg_x_neg_y_pos_z,
-        neg_x_pos_y_pos_z,
-        pos_x_neg_y_pos_z,
-        pos_x_pos_y_pos_z,
-    ])
-    neg_z = sum(get_size(n) for n in [
-        neg_x_neg_y_neg_z,
-        neg_x_pos_y_neg_z,
-        pos_x_neg_y_neg_z,
-        pos_x_pos_y_neg_z,
-    ])
-    if pos_x >= 19 or neg_x >= 19:
-        try:
-            default = max(default, (pos_x / neg_x, neg_x, "x"), (neg_x / pos_x, pos_x, "x"))
-        except ZeroDivisionError:
-            default = (float('inf'), (pos_x, neg_x), "x")
-    if pos_y >= 19 or neg_y >= 19:
-        try:
-            default = max(default, (pos_y / neg_y, neg_y, "y"), (neg_y / pos_y, pos_y, "y"))
-        except ZeroDivisionError:
-            default = (float('inf'), (pos_y, neg_y), "y")
-    if pos_z >= 19 or neg_z >= 19:
-        try:
-            default = max(default, (pos_z / neg_z, neg_z, "z"), (neg_z / pos_z, pos_z, "z"))
-        except ZeroDivisionError:
-            default = (float('inf'), (pos_z, neg_z), "z")
-    return max(default, default, *(collect_worst_ratio(child) for child in [
-        neg_x_neg_y_neg_z,
-        neg_x_neg_y_pos_z,
-        neg_x_pos_y_neg_z,
-        neg_x_pos_y_pos_z,
-        pos_x_neg_y_neg_z,
-        pos_x_neg_y_pos_z,
-        pos_x_pos_y_neg_z,
-        pos_x_pos_y_pos_z,
-    ]))
+from threedeebeetree import ThreeDeeBeeTree
+from balancing import make_ordering, stream_ordering, write_points, SpillSample, collect_worst_ratio
 
 
 class TestBalancing(unittest.TestCase):
@@ -123,4 +42,70 @@ class TestBalancing(unittest.TestCase):
             tdbt[p] = i
 
         ratio, smaller, axis = collect_worst_ratio(tdbt.root)
-        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
\ No newline at end of file
+        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+
+    @timeout()
+    @number("4.3")
+    def test_matches_from_points(self):
+        random.seed(1008)
+        points = [(random.randrange(-100, 100), random.randrange(-100, 100), random.randrange(-100, 100))
+                  for _ in range(2000)]
+        points += points[:50]
+        ordering = make_ordering(points)
+        self.assertEqual(len(ordering), len(set(points)))
+        self.assertSetEqual(set(ordering), set(points))
+
+        tdbt = ThreeDeeBeeTree()
+        for p in ordering:
+            tdbt[p] = None
+        built = ThreeDeeBeeTree.from_points((p, None) for p in points)
+        self.assertEqual(list(tdbt.iter_subtree(tdbt.root)), list(built.iter_subtree(built.root)))
+        self.assertEqual(make_ordering([]), [])
+
+    @timeout()
+    @number("4.4")
+    def test_stream_ordering(self):
+        random.seed(1008)
+        points = [(random.randrange(-1000, 1000), random.randrange(-1000, 1000), random.randrange(-1000, 1000))
+                  for _ in range(3000)]
+        points += points[:20]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'points.bin')
+            write_points(path, points)
+            for source in (iter(points), path):
+                ordering = list(stream_ordering(source, memory_budget=200, spill_dir=directory))
+                self.assertEqual(len(ordering), len(set(points)))
+                self.assertSetEqual(set(ordering), set(points))
+                tdbt = ThreeDeeBeeTree()
+                for p in ordering:
+                    tdbt[p] = None
+                ratio, smaller, axis = collect_worst_ratio(tdbt.root)
+                self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+            # the spill files are gone and the input is left alone
+            self.assertEqual(os.listdir(directory), ['points.bin'])
+
+        # a stream that fits in the budget is ordered in memory
+        self.assertEqual(list(stream_ordering(iter(points))), make_ordering(points))
+        with self.assertRaises(ValueError):
+            next(stream_ordering(points, memory_budget=0))
+
+        sample = SpillSample(8)
+        for point in points:
+            sample.add(point)
+            self.assertLess(len(sample.points), 8)
+        self.assertEqual(sample.count, len(points))
+
+    @timeout()
+    @number("4.5")
+    def test_parallel(self):
+        random.seed(1008)
+        points = [(random.randrange(-10000, 10000), random.randrange(-10000, 10000), random.randrange(-10000, 10000))
+                  for _ in range(20000)]
+        self.assertEqual(make_ordering(points, workers=2), make_ordering(points))
+        self.assertEqual(make_ordering(points[:100], workers=4), make_ordering(points[:100]))
+        # coordinates that do not fit in shared 64-bit integers are ordered serially
+        for unusual in ([(x + 0.5, y, z) for x, y, z in points[:2000]],
+                        [(x * 2 ** 70, y, z) for x, y, z in points[:2000]]):
+            self.assertEqual(make_ordering(unusual, workers=2), make_ordering(unusual))
+        with self.assertRaises(ValueError):
+            make_ordering(points, workers=0)
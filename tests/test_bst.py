@@ -77,3 +77,144 @@ class BSTTest(unittest.TestCase):
         kth = BST.kth_smallest(5, BST.root)
         self.assertEqual(kth.key, 95)
         self.assertEqual(kth.item, 1)
+
+    @timeout()
+    @number("1.4")
+    def test_degenerate(self):
+        BST = BinarySearchTree()
+        for i in range(2000):
+            BST[i] = i
+        self.assertEqual(BST.root.subtree_size, 2000)
+        self.assertEqual(BST[1999], 1999)
+        self.assertEqual(BST.kth_smallest(1500, BST.root).key, 1499)
+
+        del BST[0]
+        del BST[1000]
+        self.assertEqual(len(BST), 1998)
+        self.assertEqual(BST.root.key, 1)
+        self.assertEqual(BST.root.subtree_size, 1998)
+        self.assertNotIn(1000, BST)
+        self.assertEqual(BST.kth_smallest(1000, BST.root).key, 1001)
+
+    @timeout()
+    @number("1.5")
+    def test_from_items(self):
+        BST = BinarySearchTree.from_items([(95, 1), (73, 2), (99, 3), (50, 4), (85, 5), (80, 6)])
+        self.assertEqual(len(BST), 6)
+        self.assertEqual(BST.root.key, 85)
+        self.assertEqual(BST.root.subtree_size, 6)
+        self.assertEqual(BST.root.left.subtree_size, 3)
+        self.assertEqual(BST.root.right.subtree_size, 2)
+        self.assertEqual(BST[80], 6)
+        self.assertEqual(BST.kth_smallest(5, BST.root).key, 95)
+
+        BST = BinarySearchTree.from_items(((i, str(i)) for i in range(1000)), presorted=True)
+        self.assertEqual(BST.root.subtree_size, 1000)
+        self.assertEqual(BST[999], "999")
+        BST[1000] = "1000"
+        self.assertEqual(BST.kth_smallest(1001, BST.root).key, 1000)
+
+        with self.assertRaises(ValueError):
+            BinarySearchTree.from_items([(1, 1), (2, 2), (1, 3)])
+        with self.assertRaises(ValueError):
+            BinarySearchTree.from_items([(2, 2), (1, 1)], presorted=True)
+
+    @timeout()
+    @number("1.6")
+    def test_ranges(self):
+        BST = BinarySearchTree()
+        for key in [95, 73, 99, 50, 85, 80]:
+            BST[key] = str(key)
+
+        self.assertEqual(list(BST), [50, 73, 80, 85, 95, 99])
+        self.assertEqual(list(BST.keys(reverse=True)), [99, 95, 85, 80, 73, 50])
+        self.assertEqual(list(BST.items(73, 90)), [(73, '73'), (80, '80'), (85, '85')])
+        self.assertEqual(list(BST.items(74, 95, reverse=True)), [(95, '95'), (85, '85'), (80, '80')])
+        self.assertEqual(list(BST.keys(hi=60)), [50])
+        self.assertEqual(list(BST.keys(lo=100)), [])
+
+        self.assertEqual(BST.count_range(73, 90), 3)
+        self.assertEqual(BST.count_range(74, 95), 3)
+        self.assertEqual(BST.count_range(hi=80), 3)
+        self.assertEqual(BST.count_range(lo=81), 3)
+        self.assertEqual(BST.count_range(), 6)
+        self.assertEqual(BST.count_range(90, 60), 0)
+
+    @timeout()
+    @number("1.7")
+    def test_order_statistics(self):
+        BST = BinarySearchTree()
+        for key in [95, 73, 99, 50, 85, 80]:
+            BST[key] = str(key)
+
+        self.assertEqual(BST.rank(50), 0)
+        self.assertEqual(BST.rank(85), 3)
+        self.assertEqual(BST.rank(86), 4)
+        self.assertEqual(BST.rank(100), 6)
+        for rank, key in enumerate([50, 73, 80, 85, 95, 99]):
+            self.assertEqual(BST.select(rank).key, key)
+            self.assertEqual(BST.rank(BST.select(rank).key), rank)
+        with self.assertRaises(ValueError):
+            BST.select(6)
+
+        self.assertEqual(BST.floor(84).key, 80)
+        self.assertEqual(BST.floor(85).key, 85)
+        self.assertIsNone(BST.floor(49))
+        self.assertEqual(BST.ceiling(86).key, 95)
+        self.assertEqual(BST.ceiling(85).key, 85)
+        self.assertIsNone(BST.ceiling(100))
+        self.assertEqual(BST.predecessor(85).key, 80)
+        self.assertIsNone(BST.predecessor(50))
+        self.assertEqual(BST.successor(85).key, 95)
+        self.assertEqual(BST.successor(74).item, '80')
+        self.assertIsNone(BST.successor(99))
+
+    @timeout()
+    @number("1.8")
+    def test_batches(self):
+        BST = BinarySearchTree()
+        for key in [95, 73, 99, 50, 85, 80]:
+            BST[key] = str(key)
+
+        self.assertEqual(BST.get_many([99, 50, 85, 50]), ['99', '50', '85', '50'])
+        self.assertEqual(BST.contains_many([1, 80, 96, 73]), [False, True, False, True])
+        with self.assertRaises(KeyError):
+            BST.get_many([50, 51])
+
+        BST.update({80: 'eighty', 10: 'ten', 97: 'ninety seven', 98: 'ninety eight'})
+        BST.update([(60, 'a'), (60, 'sixty')])
+        self.assertEqual(len(BST), 10)
+        self.assertEqual(BST.root.subtree_size, 10)
+        self.assertEqual(BST.root.right.subtree_size, 3)
+        self.assertEqual(list(BST.items(lo=60, hi=80)), [(60, 'sixty'), (73, '73'), (80, 'eighty')])
+        self.assertEqual(BST.kth_smallest(9, BST.root).key, 98)
+
+    @timeout()
+    @number("1.9")
+    def test_split_join(self):
+        BST = BinarySearchTree()
+        for key in [95, 73, 99, 50, 85, 80]:
+            BST[key] = str(key)
+
+        left, right = BST.split(85)
+        self.assertEqual(len(BST), 0)
+        self.assertEqual(list(left), [50, 73, 80])
+        self.assertEqual(list(right), [85, 95, 99])
+        self.assertEqual((len(left), len(right)), (3, 3))
+        self.assertEqual(left.root.subtree_size, 3)
+        self.assertEqual(right.root.subtree_size, 3)
+
+        empty, everything = right.split(0)
+        self.assertTrue(empty.is_empty())
+        self.assertEqual(list(everything), [85, 95, 99])
+
+        joined = BinarySearchTree.join(left, everything)
+        self.assertEqual(list(joined.items()), [(50, '50'), (73, '73'), (80, '80'),
+                                                (85, '85'), (95, '95'), (99, '99')])
+        self.assertEqual(len(joined), 6)
+        self.assertEqual(joined.root.subtree_size, 6)
+        self.assertEqual(joined.kth_smallest(4, joined.root).key, 85)
+
+        low, high = joined.split(80)
+        with self.assertRaises(ValueError):
+            BinarySearchTree.join(high, low)
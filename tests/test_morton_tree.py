@@ -0,0 +1,128 @@
+import io
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from morton_tree import MortonBeeTree, BIAS, encode, decode
+from threedeebeetree import ThreeDeeBeeTree
+
+
+class TestMortonBeeTree(unittest.TestCase):
+
+    TESTING_POINTS = [
+        (6, -1, -17),
+        (-11, 4, -16),
+        (5, 5, 7),
+        (-16, 2, -6),
+        (10, -20, 1),
+        (-14, 18, -4),
+        (-18, 7, 5),
+        (16, 0, -14),
+        (-6, -14, 12),
+        (4, 6, 19)
+    ]
+
+    @timeout()
+    @number("9.1")
+    def test_codes(self):
+        for point in self.TESTING_POINTS + [(-BIAS, -BIAS, -BIAS), (BIAS - 1, BIAS - 1, BIAS - 1)]:
+            self.assertEqual(decode(encode(point)), point)
+        # x, y and z take bits 0, 1 and 2 of each group of three
+        self.assertEqual(encode((1 - BIAS, -BIAS, -BIAS)), 1)
+        self.assertEqual(encode((-BIAS, 1 - BIAS, -BIAS)), 2)
+        self.assertEqual(encode((-BIAS, -BIAS, 2 - BIAS)), 32)
+        with self.assertRaises(ValueError):
+            encode((BIAS, 0, 0))
+
+    @timeout()
+    @number("9.2")
+    def test_mapping(self):
+        tree = MortonBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tree[point] = i
+        self.assertEqual(len(tree), 10)
+        self.assertEqual(tree[(5, 5, 7)], 2)
+        self.assertIn((-6, -14, 12), tree)
+        self.assertNotIn((0, 0, 0), tree)
+        self.assertNotIn((BIAS, 0, 0), tree)
+        with self.assertRaises(KeyError):
+            _ = tree[(0, 0, 0)]
+
+        tree[(5, 5, 7)] = 'replaced'
+        self.assertEqual(len(tree), 10)
+        self.assertEqual(tree[(5, 5, 7)], 'replaced')
+
+        del tree[(6, -1, -17)]
+        self.assertNotIn((6, -1, -17), tree)
+        with self.assertRaises(ValueError):
+            del tree[(6, -1, -17)]
+        self.assertEqual(sorted(tree), sorted(self.TESTING_POINTS[1:]))
+        self.assertEqual(list(tree.codes), sorted(tree.codes))
+
+        built = MortonBeeTree.from_points([(point, i) for i, point in enumerate(self.TESTING_POINTS)]
+                                          + [((4, 6, 19), 'last')])
+        self.assertEqual(len(built), 10)
+        self.assertEqual(built[(4, 6, 19)], 'last')
+
+    @timeout()
+    @number("9.3")
+    def test_query_box(self):
+        random.seed(1008)
+        points = {(random.randrange(-500, 500), random.randrange(-500, 500), random.randrange(-500, 500)): i
+                  for i in range(3000)}
+        tree = MortonBeeTree.from_points(points.items())
+        reference = ThreeDeeBeeTree()
+        for point, item in points.items():
+            reference[point] = item
+
+        for _ in range(50):
+            lo = tuple(random.randrange(-600, 500) for _ in range(3))
+            hi = tuple(coordinate + random.randrange(0, 600) for coordinate in lo)
+            found = sorted(tree.query_box(lo, hi))
+            self.assertEqual(found, sorted(reference.query_box(lo, hi)))
+            self.assertEqual(tree.count_box(lo, hi), len(found))
+
+        self.assertEqual(tree.count_box((-500, -500, -500), (499, 499, 499)), len(points))
+        self.assertEqual(list(tree.query_box((1, 0, 0), (0, 0, 0))), [])
+        self.assertEqual(tree.count_box((-0.5, -0.5, -0.5), (0.5, 0.5, 0.5)), int((0, 0, 0) in points))
+
+    @timeout()
+    @number("9.5")
+    def test_nearest_within_radius(self):
+        random.seed(1009)
+        points = {(random.randrange(-300, 300), random.randrange(-300, 300), random.randrange(-300, 300)): i
+                  for i in range(2000)}
+        tree = MortonBeeTree.from_points(points.items())
+        reference = ThreeDeeBeeTree()
+        for point, item in points.items():
+            reference[point] = item
+
+        for _ in range(40):
+            query = tuple(random.randrange(-400, 400) for _ in range(3))
+            for k in (1, 5, 40):
+                self.assertEqual(tree.nearest(query, k), reference.nearest(query, k))
+            radius = random.choice([0, 12.5, 40, 90])
+            self.assertEqual(sorted(tree.within_radius(query, radius)),
+                             sorted(reference.within_radius(query, radius)))
+
+        # equidistant points come out smaller key first
+        tied = MortonBeeTree.from_points([((1, 0, 0), 'a'), ((-1, 0, 0), 'b'), ((0, 1, 0), 'c'), ((0, 0, 3), 'd')])
+        self.assertEqual(tied.nearest((0, 0, 0), 3), [((-1, 0, 0), 'b'), ((0, 1, 0), 'c'), ((1, 0, 0), 'a')])
+        self.assertEqual(len(tied.nearest((0, 0, 0), 10)), 4)
+        self.assertEqual(tied.nearest((0, 0, 0), 0), [])
+        self.assertEqual(MortonBeeTree().nearest((0, 0, 0)), [])
+        self.assertEqual(sorted(tied.within_radius((0.5, 0, 0), 1.5)), [((-1, 0, 0), 'b'), ((0, 1, 0), 'c'), ((1, 0, 0), 'a')])
+        self.assertEqual(list(tied.within_radius((0, 0, 0), -1)), [])
+
+    @timeout()
+    @number("9.4")
+    def test_save_load(self):
+        tree = MortonBeeTree.from_points((point, str(point)) for point in self.TESTING_POINTS)
+        buffer = io.BytesIO()
+        tree.save(buffer)
+        buffer.seek(0)
+        loaded = MortonBeeTree.load(buffer)
+        self.assertEqual(loaded.codes, tree.codes)
+        self.assertEqual(list(loaded.iter_items()), list(tree.iter_items()))
+        self.assertEqual(loaded[(5, 5, 7)], '(5, 5, 7)')
@@ -0,0 +1,128 @@
+import random
+import unittest
+from collections import Counter
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from multiset import CountedAVLTree
+from tests.test_avl import check_node
+
+
+def check_totals(test, node):
+    if node is None:
+        return 0
+    total = node.item + check_totals(test, node.left) + check_totals(test, node.right)
+    test.assertGreater(node.item, 0)
+    test.assertEqual(node.total, total)
+    return total
+
+
+class MultisetTest(unittest.TestCase):
+
+    @timeout()
+    @number("10.1")
+    def test_counts(self):
+        tree = CountedAVLTree()
+        for key in [5, 3, 5, 8, 5, 3]:
+            tree.add(key)
+        tree.add(1, 4)
+        self.assertEqual(len(tree), 10)
+        self.assertEqual(tree.length, 4)
+        self.assertEqual(tree.count(5), 3)
+        self.assertEqual(tree.count(7), 0)
+        self.assertEqual(list(tree.elements()), [1, 1, 1, 1, 3, 3, 5, 5, 5, 8])
+        self.assertEqual(list(tree.elements(3, 7)), [1, 3, 3, 5])
+        self.assertEqual(tree.rank(5), 6)
+        self.assertEqual(tree.count_less(5, inclusive=True), 9)
+        self.assertEqual(tree.count_range(2, 5), 5)
+        self.assertEqual(tree.select(6).key, 5)
+        self.assertEqual(tree.locate(7)[1], 1)
+        with self.assertRaises(ValueError):
+            tree.select(10)
+
+        tree.remove(5)
+        tree.remove(1, 10)
+        del tree[8]
+        tree[3] = 4
+        self.assertEqual(list(tree.elements()), [3, 3, 3, 3, 5, 5])
+        with self.assertRaises(ValueError):
+            tree.remove(1)
+        check_node(self, tree.root)
+        check_totals(self, tree.root)
+
+    @timeout()
+    @number("10.2")
+    def test_random_against_counter(self):
+        random.seed(1008)
+        tree = CountedAVLTree()
+        expected = Counter()
+        for i in range(5000):
+            key = random.randrange(200)
+            copies = random.randint(1, 3)
+            if random.random() < 0.55:
+                tree.add(key, copies)
+                expected[key] += copies
+            elif expected[key]:
+                tree.remove(key, copies)
+                expected[key] -= min(copies, expected[key])
+            if i % 500 == 0:
+                check_node(self, tree.root)
+                check_totals(self, tree.root)
+        expected = +expected
+        elements = sorted(expected.elements())
+        self.assertEqual(tree.length, len(expected))
+        self.assertEqual(list(tree.elements()), elements)
+        for rank in range(0, len(elements), 37):
+            self.assertEqual(tree.select(rank).key, elements[rank])
+            self.assertEqual(tree.kth_smallest(rank + 1, tree.root).key, elements[rank])
+            self.assertEqual(list(tree.elements(rank, rank + 50)), elements[rank:rank + 50])
+
+    @timeout()
+    @number("10.3")
+    def test_inherited_entry_points(self):
+        tree = CountedAVLTree()
+        tree.add(10, 2)
+        tree.update({20: 3, 5: 1})
+        tree.insert_sorted([(1, 4), (7, 2), (30, 1)])
+        check_node(self, tree.root)
+        check_totals(self, tree.root)
+        self.assertEqual(list(tree.elements()), [1, 1, 1, 1, 5, 7, 7, 10, 10, 20, 20, 20, 30])
+        self.assertEqual([tree.kth_smallest(k, tree.root).key for k in (1, 4, 5, 13)], [1, 1, 5, 30])
+        with self.assertRaises(ValueError):
+            tree.kth_smallest(14, tree.root)
+
+    @timeout()
+    @number("10.4")
+    def test_split_join(self):
+        random.seed(1008)
+        expected = Counter({key: random.randrange(1, 5) for key in range(200)})
+        tree = CountedAVLTree()
+        tree.update(expected)
+        left, right = tree.split(67)
+        for part in (left, right):
+            check_node(self, part.root)
+            check_totals(self, part.root)
+        self.assertEqual(len(left) + len(right), sum(expected.values()))
+
+        joined = CountedAVLTree.join(left, right)
+        check_node(self, joined.root)
+        check_totals(self, joined.root)
+        self.assertEqual(len(joined), sum(expected.values()))
+        self.assertEqual(Counter(joined.elements()), expected)
+        self.assertEqual(len(left), 0)
+        self.assertEqual(len(right), 0)
+
+        # the minimal key of the right side is moved over with all its copies
+        low = CountedAVLTree()
+        low.update({key: 2 for key in range(40)})
+        high = CountedAVLTree()
+        high.update({key: 3 for key in range(40, 45)})
+        joined = CountedAVLTree.join(low, high)
+        check_totals(self, joined.root)
+        self.assertEqual(joined.count(40), 3)
+        self.assertEqual(len(joined), 95)
+        self.assertEqual(len(CountedAVLTree.join(CountedAVLTree(), joined)), 95)
+        low.update({1: 1, 50: 1})
+        high.update({40: 1})
+        with self.assertRaises(ValueError):
+            CountedAVLTree.join(low, high)
@@ -0,0 +1,70 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from persistent_bst import PersistentBinarySearchTree
+
+
+def collect_nodes(node, nodes):
+    if node is not None:
+        nodes.append((node, node.key, node.item, node.left, node.right, node.subtree_size))
+        collect_nodes(node.left, nodes)
+        collect_nodes(node.right, nodes)
+    return nodes
+
+
+class PersistentBSTTest(unittest.TestCase):
+
+    @timeout()
+    @number("8.1")
+    def test_snapshot(self):
+        BST = PersistentBinarySearchTree()
+        for key in [95, 73, 99, 50, 85, 80]:
+            BST[key] = str(key)
+        snapshot = BST.snapshot()
+        before = collect_nodes(snapshot.root, [])
+
+        BST[60] = '60'
+        del BST[73]
+        del BST[95]
+        BST.update({80: 'eighty', 10: 'ten'})
+
+        # nothing reachable from the snapshot has changed
+        self.assertEqual(collect_nodes(snapshot.root, []), before)
+        self.assertEqual(list(snapshot.items()), [(50, '50'), (73, '73'), (80, '80'),
+                                                  (85, '85'), (95, '95'), (99, '99')])
+        self.assertEqual(len(snapshot), 6)
+        self.assertEqual(list(BST.items()), [(10, 'ten'), (50, '50'), (60, '60'), (80, 'eighty'),
+                                             (85, '85'), (99, '99')])
+        self.assertEqual(BST.root.subtree_size, 6)
+        self.assertEqual(BST.kth_smallest(4, BST.root).key, 80)
+
+        # untouched subtrees are shared between versions
+        newer = BST.with_item(99, 'ninety nine')
+        self.assertIs(newer.root.left, BST.root.left)
+        self.assertEqual(BST[99], '99')
+        self.assertEqual(newer[99], 'ninety nine')
+        self.assertNotIn(85, BST.without_key(85))
+        self.assertIn(85, BST)
+
+    @timeout()
+    @number("8.2")
+    def test_random_versions(self):
+        random.seed(8)
+        BST = PersistentBinarySearchTree()
+        expected = {}
+        versions = []
+        for _ in range(1000):
+            key = random.randrange(200)
+            if key in expected:
+                del BST[key]
+                del expected[key]
+            else:
+                BST[key] = key
+                expected[key] = key
+            if random.random() < 0.1:
+                versions.append((BST.snapshot(), sorted(expected.items())))
+        for version, items in versions:
+            self.assertEqual(list(version.items()), items)
+            self.assertEqual(version.count_range(), len(items))
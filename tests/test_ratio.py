@@ -1,9 +1,10 @@
+import math
 import random
 import unittest
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
-from ratio import Percentiles
+from ratio import Percentiles, CACHE_MAX_CHANGES
 
 class RatioTest(unittest.TestCase):
 
@@ -39,4 +40,73 @@ class RatioTest(unittest.TestCase):
 
         p.remove_point(82)
         res = p.ratio(13, 10)
-        self.assertSetEqual(set(res), {14, 15, 16, 87, 91})
\ No newline at end of file
+        self.assertSetEqual(set(res), {14, 15, 16, 87, 91})
+
+    @timeout()
+    @number("2.3")
+    def test_against_sorted(self):
+        random.seed(1008)
+        p = Percentiles()
+        expected = []
+        for _ in range(2000):
+            point = random.randrange(100)
+            if random.random() < 0.3:
+                p.remove_point(point)
+                if point in expected:
+                    expected.remove(point)
+            else:
+                p.add_point(point)
+                expected.append(point)
+        self.assertEqual(len(p), len(expected))
+        expected.sort()
+        n = len(expected)
+        for x, y in [(0, 0), (13, 10), (50, 49), (0, 100), (99, 0)]:
+            x_count = max(0, math.ceil(x * n / 100))
+            y_count = max(1, math.ceil(y * n / 100))
+            self.assertEqual(list(p.ratio(x, y)), expected[x_count:-y_count])
+
+        p.remove_point(1000)
+        self.assertEqual(len(p), n)
+        self.assertEqual(list(Percentiles().ratio(0, 0)), [])
+
+    @timeout()
+    @number("2.4")
+    def test_cached_counts(self):
+        random.seed(7)
+        p = Percentiles()
+        expected = [random.randrange(50) for _ in range(500)]
+        for point in expected:
+            p.add_point(point)
+        expected.sort()
+        self.assertEqual(list(p.ratio(0, 0)), expected[:-1])
+        self.assertEqual(list(p.ratio(10, 10)), expected[50:-50])
+        self.assertEqual((p.cache_hits, p.cache_patches, p.cache_rebuilds), (1, 0, 1))
+        keys, cumulative = p.sorted_counts()
+        self.assertEqual(keys, sorted(set(expected)))
+        self.assertEqual(cumulative[-1], len(expected))
+
+        # a new point, one added and removed again before the next query, one
+        # whose last copy goes, and one that is not there
+        for point in [3, 49, 3, 60, 70]:
+            p.add_point(point)
+        for point in [3, 60] + [0] * expected.count(0) + [1000]:
+            p.remove_point(point)
+        expected = sorted([point for point in expected if point != 0] + [3, 49, 70])
+        self.assertEqual(list(p.ratio(0, 0)), expected[:-1])
+        self.assertEqual(list(p.ratio(33, 33)), expected[math.ceil(33 * len(expected) / 100):
+                                                          -math.ceil(33 * len(expected) / 100)])
+        keys, cumulative = p.sorted_counts()
+        self.assertEqual(keys, sorted(set(expected)))
+        self.assertEqual(list(cumulative), [sum(1 for point in expected if point <= key) for key in keys])
+        self.assertEqual((p.cache_hits, p.cache_patches, p.cache_rebuilds), (4, 1, 1))
+
+        for point in range(CACHE_MAX_CHANGES + 1):
+            p.add_point(1000 + point)
+        self.assertEqual(list(p.ratio(0, 0))[-CACHE_MAX_CHANGES:], list(range(1000, 1000 + CACHE_MAX_CHANGES)))
+        self.assertEqual(p.cache_rebuilds, 2)
+
+        other = Percentiles()
+        other.add_point(-1)
+        p.merge(other)
+        self.assertEqual(next(p.ratio(0, 0)), -1)
+        self.assertEqual(p.cache_rebuilds, 3)
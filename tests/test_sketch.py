@@ -0,0 +1,82 @@
+import random
+import unittest
+from bisect import bisect_left
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from ratio import Percentiles
+from sketch import KLLSketch
+
+
+class SketchTest(unittest.TestCase):
+
+    def assertRankClose(self, sketch, data, rank):
+        """ The item selected for rank has a true rank within error_bound of it. """
+        true_rank = bisect_left(data, sketch.select(rank))
+        self.assertLessEqual(abs(true_rank - rank), sketch.error_bound() * len(data) + 1)
+
+    @timeout()
+    @number("11.1")
+    def test_accuracy(self):
+        random.seed(1008)
+        data = [random.random() for _ in range(50000)]
+        sketch = KLLSketch(200, seed=1008)
+        sketch.update(data)
+        data.sort()
+        self.assertEqual(len(sketch), 50000)
+        self.assertLess(sketch.size, 3 * 200)
+        self.assertLess(sketch.error_bound(), 0.02)
+        for rank in range(0, 50000, 2500):
+            self.assertRankClose(sketch, data, rank)
+            self.assertLessEqual(abs(sketch.rank(data[rank]) - rank), sketch.error_bound() * 50000 + 1)
+        with self.assertRaises(ValueError):
+            sketch.select(50000)
+        with self.assertRaises(ValueError):
+            KLLSketch(1)
+
+    @timeout()
+    @number("11.2")
+    def test_merge(self):
+        random.seed(1008)
+        parts = [[random.gauss(mean, 1) for _ in range(20000)] for mean in (0, 3, 6)]
+        merged = KLLSketch(200, seed=0)
+        for seed, part in enumerate(parts, start=1):
+            sketch = KLLSketch(200, seed=seed)
+            sketch.update(part)
+            merged.merge(sketch)
+        data = sorted(point for part in parts for point in part)
+        self.assertEqual(len(merged), 60000)
+        self.assertLess(merged.size, 3 * 200)
+        for rank in range(0, 60000, 3000):
+            self.assertRankClose(merged, data, rank)
+
+    @timeout()
+    @number("11.3")
+    def test_percentiles_sketch(self):
+        random.seed(1008)
+        exact = Percentiles()
+        approximate = [Percentiles(sketch_size=200, seed=seed) for seed in range(2)]
+        data = []
+        for i in range(40000):
+            point = random.randrange(10 ** 6)
+            data.append(point)
+            exact.add_point(point)
+            approximate[i % 2].add_point(point)
+        data.sort()
+        approximate[0].merge(approximate[1])
+        p = approximate[0]
+        self.assertEqual(len(p), 40000)
+        self.assertEqual(exact.error_bound(), 0.0)
+
+        self.assertEqual(exact.boundaries(13, 10), (data[5200], data[35999]))
+        lo, hi = p.boundaries(13, 10)
+        allowed = p.error_bound() * 40000 + 1
+        self.assertLessEqual(abs(bisect_left(data, lo) - 5200), allowed)
+        self.assertLessEqual(abs(bisect_left(data, hi) - 35999), allowed)
+
+        with self.assertRaises(ValueError):
+            p.remove_point(lo)
+        with self.assertRaises(ValueError):
+            p.ratio(13, 10)
+        with self.assertRaises(ValueError):
+            p.merge(exact)
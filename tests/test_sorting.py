@@ -0,0 +1,47 @@
+import random
+import unittest
+from unittest import mock
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from sorting import introsort, heapsort, quickselect
+
+
+class TestSorting(unittest.TestCase):
+
+    @timeout()
+    @number("12.1")
+    def test_introsort(self):
+        random.seed(1008)
+        inputs = [
+            [],
+            [1],
+            [random.randrange(1000) for _ in range(2000)],
+            list(range(2000)),
+            list(range(2000, 0, -1)),
+            [random.randrange(3) for _ in range(2000)],
+            [7] * 500,
+            [(random.randrange(5), random.random()) for _ in range(300)],
+        ]
+        for values in inputs:
+            array = list(values)
+            introsort(array)
+            self.assertEqual(array, sorted(values))
+        self.assertEqual(quickselect([5, 2, 8, 1, 9], 2), 5)
+
+    @timeout()
+    @number("12.2")
+    def test_heapsort_fallback(self):
+        random.seed(1008)
+        array = [random.randrange(100) for _ in range(50)]
+        heapsort(array, 10, 39)
+        self.assertEqual(array[10:40], sorted(array[10:40]))
+
+        # always pivoting on the first element splits sorted input one element
+        # at a time, so partitioning runs out of depth and heapsort finishes
+        array = list(range(1000))
+        with mock.patch('sorting.median_of_three', side_effect=lambda array, lo, hi: lo), \
+                mock.patch('sorting.heapsort', wraps=heapsort) as fallback:
+            introsort(array)
+        self.assertTrue(fallback.called)
+        self.assertEqual(array, list(range(1000)))
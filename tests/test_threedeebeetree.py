@@ -1,8 +1,10 @@
+import random
 import unittest
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
-from threedeebeetree import ThreeDeeBeeTree
+from threedeebeetree import ThreeDeeBeeTree, BeeNode, MAX_DEAD_FRACTION
+from balancing import collect_worst_ratio
 
 class TestThreeDeeBeeTree(unittest.TestCase):
 
@@ -64,3 +66,166 @@ class TestThreeDeeBeeTree(unittest.TestCase):
         
         self.assertEqual(tdbt.get_tree_node_by_key((16, 0, -14)).item, 7)
         self.assertEqual(tdbt.get_tree_node_by_key((6, -1, -17)).item, 0)
+
+    @timeout()
+    @number("3.4")
+    def test_lazy_children(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+
+        leaf = tdbt.get_tree_node_by_key((4, 6, 19))
+        self.assertTrue(tdbt.is_leaf(leaf))
+        self.assertIsNone(leaf.children)
+        self.assertIsNone(leaf.get_child_for_key((0, 0, 0)))
+        self.assertFalse(hasattr(leaf, "__dict__"))
+        self.assertEqual(len(tdbt.root.child_nodes), 8)
+
+        # the old name still builds, reads and writes the children
+        child = BeeNode((1, 1, 1), 'child')
+        node = BeeNode((0, 0, 0), 'node', subtree_size=2, child_nodes=[None] * 7 + [child])
+        self.assertIs(node.children[7], child)
+        self.assertIs(node.get_child_for_key((1, 1, 1)), child)
+        leaf.child_nodes[7] = child
+        self.assertEqual(len(leaf.children), 8)
+        self.assertIs(leaf.get_child_for_key((5, 7, 20)), child)
+
+    @timeout()
+    @number("3.5")
+    def test_query_box(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+
+        found = dict(tdbt.query_box((-16, -5, -20), (10, 10, 0)))
+        self.assertEqual(found, {(6, -1, -17): 0, (-11, 4, -16): 1, (-16, 2, -6): 3})
+        self.assertEqual(tdbt.count_box((-16, -5, -20), (10, 10, 0)), 3)
+        self.assertEqual(tdbt.count_box((-20, -20, -20), (20, 20, 20)), 10)
+        self.assertEqual(list(tdbt.query_box((0, 0, 0), (1, 1, 1))), [])
+        self.assertEqual(list(tdbt.query_box((5, 5, 7), (5, 5, 7))), [((5, 5, 7), 2)])
+
+    @timeout()
+    @number("3.6")
+    def test_nearest(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+
+        self.assertEqual(tdbt.nearest((5, 5, 6)), [((5, 5, 7), 2)])
+        self.assertEqual([key for key, _ in tdbt.nearest((0, 0, 0), k=3)],
+                         [(5, 5, 7), (-16, 2, -6), (6, -1, -17)])
+        self.assertEqual(len(tdbt.nearest((0, 0, 0), k=20)), 10)
+        self.assertEqual(ThreeDeeBeeTree().nearest((0, 0, 0)), [])
+
+        self.assertEqual(sorted(tdbt.within_radius((0, 0, 0), 17.5)),
+                         [((-16, 2, -6), 3), ((5, 5, 7), 2)])
+        self.assertEqual(list(tdbt.within_radius((100, 100, 100), 50)), [])
+
+    @timeout()
+    @number("3.7")
+    def test_from_points(self):
+        tdbt = ThreeDeeBeeTree.from_points((point, i) for i, point in enumerate(self.TESTING_POINTS))
+        self.assertEqual(len(tdbt), 10)
+        self.assertEqual(tdbt.root.subtree_size, 10)
+        for i, point in enumerate(self.TESTING_POINTS):
+            self.assertEqual(tdbt[point], i)
+
+        random.seed(10239123)
+        coords = list(range(10000))
+        random.shuffle(coords)
+        points = [(coords[3 * i], coords[3 * i + 1], coords[3 * i + 2]) for i in range(3000)]
+        tdbt = ThreeDeeBeeTree.from_points((point, i) for i, point in enumerate(points))
+        ratio, smaller, axis = collect_worst_ratio(tdbt.root)
+        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+        self.assertEqual(tdbt.count_box((0, 0, 0), (10000, 10000, 10000)), 3000)
+
+    @timeout()
+    @number("3.8")
+    def test_delete(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+        tdbt[(5, 5, 7)] = "replaced"
+        self.assertEqual(len(tdbt), 10)
+        self.assertEqual(tdbt[(5, 5, 7)], "replaced")
+
+        del tdbt[(4, 6, 19)]
+        del tdbt[(-11, 4, -16)]
+        del tdbt[(6, -1, -17)]
+        self.assertEqual(len(tdbt), 7)
+        self.assertEqual(tdbt.root.subtree_size, 7)
+        self.assertNotIn((-11, 4, -16), tdbt)
+        for i, point in enumerate(self.TESTING_POINTS[3:9], start=3):
+            self.assertIn(point, tdbt)
+        self.assertEqual(tdbt.count_box((-20, -20, -20), (20, 20, 20)), 7)
+        with self.assertRaises(ValueError):
+            del tdbt[(6, -1, -17)]
+
+    @timeout()
+    @number("3.9")
+    def test_rebuild(self):
+        tdbt = ThreeDeeBeeTree(max_ratio=7)
+        for i in range(1000):
+            tdbt[(i, 2 * i, -i)] = i
+        ratio, smaller, axis = collect_worst_ratio(tdbt.root)
+        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+
+        for i in range(0, 1000, 3):
+            del tdbt[(i, 2 * i, -i)]
+        ratio, smaller, axis = collect_worst_ratio(tdbt.root)
+        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+        self.assertEqual(len(tdbt), 666)
+        self.assertEqual(tdbt.root.subtree_size, 666)
+        self.assertEqual(tdbt[(1, 2, -1)], 1)
+
+    @timeout()
+    @number("3.10")
+    def test_degenerate(self):
+        tdbt = ThreeDeeBeeTree()
+        for i in range(2000):
+            tdbt[(i, i, i)] = i
+        self.assertEqual(len(tdbt), 2000)
+        self.assertEqual(tdbt.root.subtree_size, 2000)
+        self.assertEqual(tdbt[(1999, 1999, 1999)], 1999)
+        self.assertNotIn((1999, 1999, 1998), tdbt)
+
+    @timeout()
+    @number("3.11")
+    def test_delete_root(self):
+        random.seed(1008)
+        points = {(random.randrange(-1000, 1000), random.randrange(-1000, 1000), random.randrange(-1000, 1000)): i
+                  for i in range(2000)}
+        tdbt = ThreeDeeBeeTree.from_points(points.items())
+        rebuilt = []
+        original = tdbt.build_balanced
+
+        def build_balanced(items):
+            rebuilt.append(len(items))
+            return original(items)
+
+        tdbt.build_balanced = build_balanced
+        # always delete the highest live point, which is the root whenever it is live
+        for _ in range(1500):
+            key, _ = next(tdbt.iter_subtree(tdbt.root))
+            del tdbt[key]
+            del points[key]
+        # the rebuilds together touch O(n) points, where rebuilding the subtree of
+        # every deleted node would touch O(n) points on every deletion
+        self.assertLessEqual(sum(rebuilt), 2 * 2000)
+        self.assertLessEqual(tdbt.dead, MAX_DEAD_FRACTION * (len(tdbt) + tdbt.dead))
+        self.assertEqual(len(tdbt), 500)
+        self.assertEqual(tdbt.root.subtree_size, 500)
+        self.assertEqual(dict(tdbt.iter_subtree(tdbt.root)), points)
+        self.assertEqual(tdbt.count_box((-1000, -1000, -1000), (1000, 1000, 1000)), 500)
+
+        # deleted points can come back, and are gone for every query until then
+        key = next(iter(points))
+        del tdbt[key]
+        self.assertNotIn(key, tdbt)
+        self.assertNotIn(key, [found for found, _ in tdbt.nearest(key, k=3)])
+        self.assertEqual(list(tdbt.within_radius(key, 0)), [])
+        with self.assertRaises(ValueError):
+            del tdbt[key]
+        tdbt[key] = 'back'
+        self.assertEqual(tdbt[key], 'back')
+        self.assertEqual(tdbt.root.subtree_size, 500)
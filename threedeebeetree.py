@@ -1,17 +1,164 @@
 from __future__ import annotations
-from typing import Generic, TypeVar, Tuple
-from dataclasses import dataclass, field
+from typing import Generic, Iterable, Iterator, TypeVar, Tuple
+from dataclasses import InitVar, dataclass, field
+from heapq import nsmallest
+from heap import MaxHeap
+from sorting import quickselect
 
 I = TypeVar('I')
 Point = Tuple[int, int, int]
 
-@dataclass
+# number of points near the median triple tried as the splitting point by median_split_point
+SPLIT_CANDIDATES = 5
+
+# largest number of points median_split_point looks at to estimate the medians
+SPLIT_SAMPLE = 255
+
+# a side of an axis needs at least this many points before its ratio can trigger a rebuild,
+# the same threshold the balancing tests use
+MIN_REBUILD_SIZE = 19
+
+# largest fraction of the nodes of the tree that may be deleted points before it is rebuilt
+MAX_DEAD_FRACTION = 0.5
+
+# item of the node of a deleted point, which stays in the tree to route searches
+DELETED = object()
+
+# region of space covered by the root, each axis is the half-open interval [lo, hi)
+UNBOUNDED_LO = (float('-inf'), float('-inf'), float('-inf'))
+UNBOUNDED_HI = (float('inf'), float('inf'), float('inf'))
+
+
+def get_octant(key: Point, point: Point) -> int:
+    """
+    Returns the octant of a node with this key that point belongs to, following
+    get_child_for_key: bit 1, 2 and 4 are set when the x, y and z coordinates
+    of point are >= those of the key.
+    """
+    octant = 0
+    if point[0] >= key[0]:
+        octant += 1
+    if point[1] >= key[1]:
+        octant += 2
+    if point[2] >= key[2]:
+        octant += 4
+    return octant
+
+
+def split_imbalance(columns: list[list[int]], split: Point) -> float:
+    """
+    Returns the worst ratio, over the three axes, between the number of the other
+    points on the larger and on the smaller side of split, where columns holds
+    the x, y and z coordinates of all the points.
+    """
+    n = len(columns[0]) - 1
+    worst = 1.0
+    for axis in range(3):
+        # split[axis] <= coordinate, counted in C by sum and map
+        positive = sum(map(split[axis].__le__, columns[axis])) - 1
+        larger = max(positive, n - positive)
+        worst = max(worst, larger / max(1, n - larger))
+    return worst
+
+
+def median_split_point(points: list[Point]) -> Point:
+    """
+    Chooses the point of a (non-empty) set to split it on, so that every axis
+    is divided as evenly as possible.
+
+    Doc: the median of each coordinate is estimated with quickselect over an
+    evenly spaced sample of at most SPLIT_SAMPLE points (all of them for sets
+    of at most SPLIT_SAMPLE points). the SPLIT_CANDIDATES sampled points closest to that median triple,
+    measuring every axis relative to the spread of the points on it, are then
+    tried against the whole set and the one with the smallest split_imbalance wins.
+    the choice is deterministic, so the same set always splits the same way.
+    sets of at most MIN_REBUILD_SIZE points split on their first point.
+
+    time complexity: O(n) on average, where n is the number of points.
+    """
+    n = len(points)
+    if n <= MIN_REBUILD_SIZE:
+        # neither side of any axis can reach MIN_REBUILD_SIZE, so every split is balanced
+        return points[0]
+    columns = [[point[axis] for point in points] for axis in range(3)]
+    sample = points[::(n + SPLIT_SAMPLE - 1) // SPLIT_SAMPLE]
+    sample_columns = [[point[axis] for point in sample] for axis in range(3)]
+    mx, my, mz = (quickselect(column, len(sample) // 2) for column in sample_columns)
+    sx, sy, sz = (1 / ((max(column) - min(column)) or 1) for column in columns)
+
+    def distance(point):
+        return max(abs(point[0] - mx) * sx, abs(point[1] - my) * sy, abs(point[2] - mz) * sz)
+
+    candidates = nsmallest(SPLIT_CANDIDATES, sample, key=distance)
+    return min(candidates, key=lambda candidate: split_imbalance(columns, candidate))
+
+
+def child_region(key: Point, octant: int, lo: tuple, hi: tuple) -> tuple[tuple, tuple]:
+    """
+    Returns the region (lo, hi) of the given octant of a node with this key whose
+    own region is (lo, hi). Following get_child_for_key, bit 1, 2 and 4 of the octant
+    are set when the x, y and z coordinates are >= those of the key.
+    """
+    child_lo = list(lo)
+    child_hi = list(hi)
+    for axis in range(3):
+        if octant & (1 << axis):
+            child_lo[axis] = key[axis]
+        else:
+            child_hi[axis] = key[axis]
+    return tuple(child_lo), tuple(child_hi)
+
+
+def region_intersects_box(lo: tuple, hi: tuple, box_lo: Point, box_hi: Point) -> bool:
+    """ Whether the region [lo, hi) can hold a point of the closed box [box_lo, box_hi]. """
+    return all(lo[axis] <= box_hi[axis] and box_lo[axis] < hi[axis] for axis in range(3))
+
+
+def region_inside_box(lo: tuple, hi: tuple, box_lo: Point, box_hi: Point) -> bool:
+    """ Whether every point of the region [lo, hi) is in the closed box [box_lo, box_hi]. """
+    return all(box_lo[axis] <= lo[axis] and hi[axis] <= box_hi[axis] for axis in range(3))
+
+
+def region_distance_squared(point: Point, lo: tuple, hi: tuple) -> float:
+    """ Squared Euclidean distance from point to the closest point of the region [lo, hi). """
+    distance = 0
+    for axis in range(3):
+        if point[axis] < lo[axis]:
+            distance += (lo[axis] - point[axis]) ** 2
+        elif point[axis] > hi[axis]:
+            distance += (point[axis] - hi[axis]) ** 2
+    return distance
+
+
+def distance_squared(a: Point, b: Point) -> int:
+    """ Squared Euclidean distance between two points. """
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+
+def point_in_box(point: Point, box_lo: Point, box_hi: Point) -> bool:
+    """ Whether point is in the closed box [box_lo, box_hi]. """
+    return (box_lo[0] <= point[0] <= box_hi[0] and box_lo[1] <= point[1] <= box_hi[1]
+            and box_lo[2] <= point[2] <= box_hi[2])
+
+
+@dataclass(slots=True)
 class BeeNode:
+    """
+    Node of the 3DBT. Slotted, and the list of the 8 octant children is only
+    allocated once the node gets its first child, so leaves stay small.
+    child_nodes is the old name of children: the constructor still accepts it,
+    and reading it allocates the list, so the tree itself only uses children.
+    """
 
     key: Point
     item: I
     subtree_size: int = 1
-    child_nodes: list[BeeNode | None] = field(default_factory=lambda: [None] * 8)
+    children: list[BeeNode | None] | None = field(default=None, repr=False)
+    child_nodes: InitVar[list[BeeNode | None] | None] = None
+
+    def __post_init__(self, child_nodes: list[BeeNode | None] | None) -> None:
+        if child_nodes is not None:
+            self.children = child_nodes
 
     def get_child_for_key(self, point: Point) -> BeeNode | None:
         """
@@ -26,6 +173,8 @@ class BeeNode:
         time complexity O(1) because it performs a constant number of operations
         regardless of the size of the tree or the number of child nodes.
         """
+        if self.children is None:
+            return None
         x,y,z = self.key
         bx,by,bz = point
 
@@ -37,19 +186,98 @@ class BeeNode:
         if bz >= z:
             octant += 4
 
-        return self.child_nodes[octant]
+        return self.children[octant]
+
+
+def get_child_nodes(node: BeeNode) -> list[BeeNode | None]:
+    """ The 8 octant children of node, allocating them on first access. """
+    if node.children is None:
+        node.children = [None] * 8
+    return node.children
+
 
+def set_child_nodes(node: BeeNode, child_nodes: list[BeeNode | None]) -> None:
+    node.children = child_nodes
+
+
+# defined once the dataclass exists, as the constructor takes child_nodes as an InitVar of the same name
+BeeNode.child_nodes = property(get_child_nodes, set_child_nodes)
 
 
 class ThreeDeeBeeTree(Generic[I]):
     """ 3️⃣🇩🐝🌳 tree. """
 
-    def __init__(self) -> None:
+    def __init__(self, max_ratio: float | None = None) -> None:
         """
             Initialises an empty 3DBT
+
+            Deleted points are only marked as DELETED, see __delitem__, and
+            self.dead counts them. subtree_size counts live points only.
+
+            When max_ratio is given, every insertion or deletion rebuilds the
+            highest subtree on its path whose ratio between the two sides of
+            any axis (see node_imbalance) has grown above max_ratio, in the
+            manner of a scapegoat tree. Otherwise the shape of the tree only
+            depends on the order of insertion.
         """
         self.root = None
         self.length = 0
+        self.dead = 0
+        self.max_ratio = max_ratio
+
+    @classmethod
+    def from_points(cls, points: Iterable[tuple[Point, I]]) -> ThreeDeeBeeTree[I]:
+        """
+        Builds a balanced 3DBT from an iterable of (point, item) pairs.
+        A point given more than once keeps its last item.
+
+        Doc: every set of points is split on the point chosen by
+        median_split_point, which becomes the node, and the rest are sorted
+        into its 8 octants with get_octant; each octant is then built the same
+        way, using an explicit stack instead of recursion. the size of every
+        set is known up front, so subtree_size is set as each node is created.
+
+        time complexity: O(n log n) on average, where n is the number of points,
+        as every level of the tree does O(n) work and there are O(log n) levels.
+        """
+        items = dict(points)
+        tree = cls()
+        tree.root = tree.build_balanced(items)
+        tree.length = len(items)
+        return tree
+
+    def build_balanced(self, items: dict[Point, I]) -> BeeNode | None:
+        """
+        Builds a balanced subtree out of a dictionary from point to item and
+        returns its root, see from_points.
+
+        time complexity: O(n log n) on average, where n is the number of points.
+        """
+        if not items:
+            return None
+
+        root = None
+        stack = [(None, 0, list(items))]
+        while stack:
+            parent, octant, group = stack.pop()
+            key = median_split_point(group)
+            current = BeeNode(key, items[key], subtree_size=len(group),
+                              children=[None] * 8 if len(group) > 1 else None)
+            if parent is None:
+                root = current
+            else:
+                parent.children[octant] = current
+
+            octants = [[] for _ in range(8)]
+            x, y, z = key
+            for point in group:
+                if point != key:
+                    # get_octant(key, point), inlined as this is the hottest loop
+                    octants[(point[0] >= x) + 2 * (point[1] >= y) + 4 * (point[2] >= z)].append(point)
+            for child_octant, child_group in enumerate(octants):
+                if child_group:
+                    stack.append((current, child_octant, child_group))
+        return root
 
     def is_empty(self) -> bool:
         """
@@ -87,11 +315,11 @@ class ThreeDeeBeeTree(Generic[I]):
         It start with the self.root being the current and then it enter a while loop
         if the current isnt none it checks if the current node's key matches the desired key
         if it is , then  it means the node with the desired key has been found, so it returns the current node
-        If the keys are not equal, then it calculates the octant value based on the comparisons
-        between the coordinates of the key and the current node's key . after that
-        the octant value determines the direction to traverse the tree based on the comparisons.
-        It helps determine which child node to explore next.
-        The method calls current.get_child_for_key(key) to retrieve the child node in the appropriate octant based on the key value
+        If the keys are not equal, then it calculates the octant value once, based on the comparisons
+        between the coordinates of the key and the current node's key, and uses it to index
+        the children of the current node directly to get the child node to explore next.
+        a node without children ends the search. the walk itself is find_node, and
+        the node of a deleted point counts as missing.
 
         time complexity:
 
@@ -101,22 +329,142 @@ class ThreeDeeBeeTree(Generic[I]):
         worst case: O(log n) where n is the number of the nodes in the tree as it
         needs to traverse the tree from the root to the leaf nodes or until the desired node is found
         """
-        current = self.root
+        current = self.find_node(self.root, key)
+        if current is None or current.item is DELETED:
+            raise KeyError(f"Key {key} not in tree.")
+        return current
+
+    def find_node(self, current: BeeNode | None, key: Point, path: list[BeeNode] | None = None) -> BeeNode | None:
+        """
+        Walks down from current towards key and returns the node holding it,
+        deleted or not, or None if there is none. When a path list is given,
+        every node passed on the way is appended to it, so that without a node
+        for key the last one is the node it would be inserted under. This is the
+        one walk every lookup, insertion and deletion goes through.
+
+        time complexity: O(D) where D is the depth of the node or of the missing child
+        """
+        x, y, z = key
         while current is not None:
-            if current.key == key:
+            node_key = current.key
+            if node_key == key:
                 return current
-            octant = 0
-            if key[0] >= current.key[0]:
-                octant += 1
-            if key[1] >= current.key[1]:
-                octant += 2
-            if key[2] >= current.key[2]:
-                octant += 4
-            current = current.get_child_for_key(key)
-        raise KeyError(f"Key {key} not in tree.")
+            if path is not None:
+                path.append(current)
+            children = current.children
+            if children is None:
+                return None
+            # get_octant(node_key, key), inlined as this runs for every level of every walk
+            current = children[(x >= node_key[0]) + 2 * (y >= node_key[1]) + 4 * (z >= node_key[2])]
+        return None
 
     def __setitem__(self, key: Point, item: I) -> None:
         self.root = self.insert_aux(self.root, key, item)
+        if self.max_ratio is not None:
+            self.rebalance_path(key)
+
+    def __delitem__(self, key: Point) -> None:
+        """
+        Deletes the point key from the tree.
+
+        Doc: the path from the root to the node is walked first. a leaf is
+        unlinked from its parent. the points below any other node were sorted
+        into octants around its key, so the node stays in the tree to route
+        searches and only has its item replaced by DELETED, in the manner of a
+        scapegoat tree. the node and every ancestor lose one from their
+        subtree_size, which counts live points only. once more than
+        MAX_DEAD_FRACTION of the nodes of the tree are deleted points, the whole
+        tree is rebuilt from the live ones with build_balanced. otherwise, when
+        max_ratio is set, the highest unbalanced subtree on the path is rebuilt.
+
+        time complexity: O(D) where D is the depth of the node, plus an O(n log n)
+        rebuild of the n live points after every n / MAX_DEAD_FRACTION deletions
+        or so, so O(D + log n) amortised.
+        """
+        path = []
+        current = self.find_node(self.root, key, path)
+        if current is None or current.item is DELETED:
+            raise ValueError('Deleting non-existent item')
+
+        for ancestor in path:
+            ancestor.subtree_size -= 1
+        self.length -= 1
+        if self.is_leaf(current):
+            if not path:
+                self.root = None
+            else:
+                path[-1].children[get_octant(path[-1].key, key)] = None
+        else:
+            current.item = DELETED
+            current.subtree_size -= 1
+            self.dead += 1
+            if self.dead > MAX_DEAD_FRACTION * (self.length + self.dead):
+                self.root = self.rebuild_subtree(self.root)
+                return
+        if self.max_ratio is not None:
+            self.rebalance_path(key)
+
+    def rebuild_subtree(self, current: BeeNode) -> BeeNode | None:
+        """
+        Returns a balanced rebuild of the live points of the subtree rooted at
+        current, see build_balanced, dropping its deleted points from self.dead.
+
+        time complexity: O(m log m) where m is the number of nodes of the subtree.
+        """
+        items = {}
+        nodes = 0
+        for node in self.iter_nodes(current):
+            nodes += 1
+            if node.item is not DELETED:
+                items[node.key] = node.item
+        self.dead -= nodes - len(items)
+        return self.build_balanced(items)
+
+    def node_imbalance(self, current: BeeNode) -> float:
+        """
+        Returns the worst ratio, over the three axes, between the number of live
+        points in the octants on the larger and on the smaller side of current. Axes whose
+        larger side holds fewer than MIN_REBUILD_SIZE points count as balanced.
+
+        time complexity: O(1)
+        """
+        if current.children is None:
+            return 1.0
+        s = [child.subtree_size if child is not None else 0 for child in current.children]
+        total = sum(s)
+        if total < MIN_REBUILD_SIZE:
+            return 1.0
+        worst = 1.0
+        for positive in (s[1] + s[3] + s[5] + s[7], s[2] + s[3] + s[6] + s[7], s[4] + s[5] + s[6] + s[7]):
+            larger = max(positive, total - positive)
+            if larger >= MIN_REBUILD_SIZE:
+                smaller = total - larger
+                worst = max(worst, larger / smaller if smaller else float('inf'))
+        return worst
+
+    def rebalance_path(self, key: Point) -> None:
+        """
+        Rebuilds the highest subtree on the search path of key whose node_imbalance
+        is above max_ratio, if there is one. Rebuilding a subtree of m points costs
+        O(m log m) but leaves it balanced, so it takes many more updates below it
+        before it needs rebuilding again.
+
+        time complexity: O(D) when nothing is rebuilt, where D is the length of the path
+        """
+        parent = None
+        current = self.root
+        while current is not None:
+            if self.node_imbalance(current) > self.max_ratio:
+                replacement = self.rebuild_subtree(current)
+                if parent is None:
+                    self.root = replacement
+                else:
+                    parent.children[get_octant(parent.key, current.key)] = replacement
+                return
+            if current.key == key:
+                return
+            parent = current
+            current = current.get_child_for_key(key)
 
     #must edit
     def insert_aux(self, current: BeeNode, key: Point, item: I) -> BeeNode:
@@ -125,64 +473,228 @@ class ThreeDeeBeeTree(Generic[I]):
 
         Doc: first this code checks if the current is none if it is then it
         means the tree is empty at that position, so a new node is
-        created with the given key and item and returned . whenn it isnt none
-        the method determines the octant in which the new node should be inserted.
-        It compares the coordinates of the key with the coordinates of the current
-        node's key to determine the appropriate octant based on their relative values.
-        after that , the method calls current.get_child_for_key(key) to retrieve the
-        child node in the determined octant and source it to child . if its none
-        then it does the same thing where there is no existing node in that octant
-        it will assign as the new node is created with the given key and item
-        If the child node exists, the method recursively calls self.insert_aux
-        to continue the insertion process on the child node until a suitable position is found.
-        After inserting the new node or completing the recursive insertion process, the subtree_size
-        of the current node is incremented to account for the newly added node or updated subtree size.
-
-        time complexity:
-
-        best case: O(1) this is when the tree is empty (current is None),
-        the given code creates a new node and returns it in constant time.
-
-        worst case: The overall time complexity of the insert_aux method depends on
-        the shape and balance of the tree. In balanced trees, such as when using an optimized
-        insertion algorithm, the time complexity can be O(log n) on average. In unbalanced trees,
-        the time complexity can degrade to O(n) in the worst case.
-
-
+        created with the given key and item and returned . otherwise the tree
+        is walked down by find_node in a loop instead of recursing, collecting
+        the nodes passed on a path stack. when the key is not found the new node
+        is placed in the octant of the last node on the path (allocating the
+        children list if the node had none) and every node on the path has its
+        subtree_size incremented to account for it.
+        a key that is already in the tree only has its item replaced, so nothing
+        grows and the length is unchanged, unless it was deleted: its node is then
+        live again and counted like a new one.
+
+        time complexity: O(D) where D is the depth the key ends up at, as the walk
+        visits every node on its path once and then the path stack is walked once.
+
+        best case: O(1) when the tree is empty (current is None) or the key is at the root.
+
+        worst case: O(log n) on average for a balanced tree, where n is the number
+        of nodes, and O(n) when the insertion order has made the tree degenerate
+        into a single path.
         """
         if current is None:
+            self.length += 1
             return BeeNode(key, item)
 
-        octant = 0
-        if key[0] >= current.key[0]:
-            octant += 1
-        if key[1] >= current.key[1]:
-            octant += 2
-        if key[2] >= current.key[2]:
-            octant += 4
-
-        child = current.get_child_for_key(key)
-        if child is None:
-            child = BeeNode(key, item)
-            current.child_nodes[octant] = child
+        path = []
+        node = self.find_node(current, key, path)
+        if node is None:
+            parent = path[-1]
+            if parent.children is None:
+                parent.children = [None] * 8
+            parent.children[get_octant(parent.key, key)] = BeeNode(key, item)
+        elif node.item is DELETED:
+            # the point was deleted, so its node comes back to life
+            path.append(node)
+            self.dead -= 1
+            node.item = item
         else:
-            current.child_nodes[octant] = self.insert_aux(child, key, item)
+            # the point is already in the tree, so only its item changes
+            node.item = item
+            return current
 
-        current.subtree_size += 1
+        for node in path:
+            node.subtree_size += 1
+        self.length += 1
         return current
 
     # must edit
     def is_leaf(self, current: BeeNode) -> bool:
         """ Simple check whether or not the node is a leaf. """
-        for child in current.child_nodes:
+        if current.children is None:
+            return True
+        for child in current.children:
             if child is not None:
                 return False
         return True
 
+    def query_box(self, lo: Point, hi: Point) -> Iterator[tuple[Point, I]]:
+        """
+        Lazily yields the (key, item) pairs of every point p with lo <= p <= hi on all three axes.
+
+        Doc: the tree is walked with an explicit stack of nodes together with the
+        region of space their subtree covers, which is cut down at every level
+        by the octant the child sits in. a child whose region cannot meet the
+        box is never visited, and a child whose region lies entirely inside the
+        box has its whole subtree yielded without any more coordinate checks.
+
+        time complexity: O(V + m) where V is the number of nodes whose region
+        crosses the boundary of the box and m the number of points yielded.
+        """
+        if self.root is None:
+            return
+        stack = [(self.root, UNBOUNDED_LO, UNBOUNDED_HI)]
+        while stack:
+            current, region_lo, region_hi = stack.pop()
+            if region_inside_box(region_lo, region_hi, lo, hi):
+                yield from self.iter_subtree(current)
+                continue
+            if point_in_box(current.key, lo, hi) and current.item is not DELETED:
+                yield current.key, current.item
+            if current.children is None:
+                continue
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    child_lo, child_hi = child_region(current.key, octant, region_lo, region_hi)
+                    if region_intersects_box(child_lo, child_hi, lo, hi):
+                        stack.append((child, child_lo, child_hi))
+
+    def count_box(self, lo: Point, hi: Point) -> int:
+        """
+        Counts the points p with lo <= p <= hi on all three axes.
+
+        Doc: the same walk as query_box, except that a subtree whose region lies
+        entirely inside the box adds its subtree_size without being visited.
+
+        time complexity: O(V) where V is the number of nodes whose region crosses
+        the boundary of the box.
+        """
+        if self.root is None:
+            return 0
+        count = 0
+        stack = [(self.root, UNBOUNDED_LO, UNBOUNDED_HI)]
+        while stack:
+            current, region_lo, region_hi = stack.pop()
+            if region_inside_box(region_lo, region_hi, lo, hi):
+                count += current.subtree_size
+                continue
+            if point_in_box(current.key, lo, hi) and current.item is not DELETED:
+                count += 1
+            if current.children is None:
+                continue
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    child_lo, child_hi = child_region(current.key, octant, region_lo, region_hi)
+                    if region_intersects_box(child_lo, child_hi, lo, hi):
+                        stack.append((child, child_lo, child_hi))
+        return count
+
+    def nearest(self, point: Point, k: int = 1) -> list[tuple[Point, I]]:
+        """
+        Returns the (key, item) pairs of the k points closest to point by Euclidean
+        distance, closest first. Ties are broken by the smaller key.
+
+        Doc: the best k candidates found so far are kept in a MaxHeap bounded to k,
+        the farthest one on top, like the beehive selector keeps its best hives.
+        the tree is walked depth first with the children pushed so that the
+        nearest region is visited first, and once the heap is full any region
+        farther away than the top of the heap is pruned.
+
+        time complexity: O(V log k) where V is the number of nodes whose region
+        is closer than the kth nearest point, O(n log k) in the worst case.
+        """
+        if self.root is None or k <= 0:
+            return []
+        best = MaxHeap(k)
+        stack = [(0, self.root, UNBOUNDED_LO, UNBOUNDED_HI)]
+        while stack:
+            region_distance, current, region_lo, region_hi = stack.pop()
+            if best.is_full() and region_distance > best.peek_max()[0]:
+                continue
+
+            if current.item is not DELETED:
+                candidate = (distance_squared(point, current.key), current.key, current.item)
+                if not best.is_full():
+                    best.add(candidate)
+                elif candidate[:2] < best.peek_max()[:2]:
+                    best.get_max()
+                    best.add(candidate)
+
+            if current.children is None:
+                continue
+            children = []
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    child_lo, child_hi = child_region(current.key, octant, region_lo, region_hi)
+                    child_distance = region_distance_squared(point, child_lo, child_hi)
+                    if not best.is_full() or child_distance <= best.peek_max()[0]:
+                        children.append((child_distance, octant, child, child_lo, child_hi))
+            # farthest first on the stack, so the nearest region is popped next
+            children.sort(reverse=True)
+            for child_distance, _, child, child_lo, child_hi in children:
+                stack.append((child_distance, child, child_lo, child_hi))
+
+        found = []
+        while len(best) > 0:
+            _, key, item = best.get_max()
+            found.append((key, item))
+        found.reverse()
+        return found
+
+    def within_radius(self, point: Point, radius: float) -> Iterator[tuple[Point, I]]:
+        """
+        Lazily yields the (key, item) pairs of every point at Euclidean distance
+        at most radius from point, in no particular order.
+
+        Doc: the same walk as query_box, pruning every child whose region is
+        farther than radius from point.
+
+        time complexity: O(V + m) where V is the number of nodes whose region
+        comes within radius of point and m the number of points yielded.
+        """
+        if self.root is None:
+            return
+        limit = radius * radius
+        stack = [(self.root, UNBOUNDED_LO, UNBOUNDED_HI)]
+        while stack:
+            current, region_lo, region_hi = stack.pop()
+            if distance_squared(point, current.key) <= limit and current.item is not DELETED:
+                yield current.key, current.item
+            if current.children is None:
+                continue
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    child_lo, child_hi = child_region(current.key, octant, region_lo, region_hi)
+                    if region_distance_squared(point, child_lo, child_hi) <= limit:
+                        stack.append((child, child_lo, child_hi))
+
+    def iter_subtree(self, current: BeeNode | None) -> Iterator[tuple[Point, I]]:
+        """
+        Yields the (key, item) pairs of every live point in the subtree rooted at
+        current, in no particular order, using an explicit stack.
+
+        time complexity: O(n) where n is the number of nodes of the subtree.
+        """
+        for node in self.iter_nodes(current):
+            if node.item is not DELETED:
+                yield node.key, node.item
+
+    def iter_nodes(self, current: BeeNode | None) -> Iterator[BeeNode]:
+        """
+        Yields every node of the subtree rooted at current, deleted points
+        included, parents before their children.
+
+        time complexity: O(n) where n is the number of nodes of the subtree.
+        """
+        stack = [current] if current is not None else []
+        while stack:
+            current = stack.pop()
+            yield current
+            if current.children is not None:
+                for child in current.children:
+                    if child is not None:
+                        stack.append(child)
 
-    """
-    return all(child is None for child in current.children)
-    """
 if __name__ == "__main__":
     tdbt = ThreeDeeBeeTree()
     tdbt[(3, 3, 3)] = "A"